@@ -0,0 +1,19 @@
+"""
+Gunicorn configuration for the Flask API.
+
+A single worker process owns the embedding model, ChromaDB clients and
+agent objects, which server.py builds in a background thread after
+import (POST /chat returns 503 until they are ready, so a slow first
+ingest never trips the worker timeout); concurrency comes from
+the gthread worker's thread pool, so requests block on Groq I/O and the
+shared embedding batcher in parallel without loading the model twice.
+
+Usage:
+    gunicorn server:app
+"""
+
+bind = "0.0.0.0:8000"
+workers = 1
+worker_class = "gthread"
+threads = 16
+timeout = 180
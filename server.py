@@ -1,5 +1,9 @@
 import os
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import orjson
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
@@ -14,10 +18,6 @@ Workflow:
 """
 
 import sys
-from src.document_processor import DocumentProcessor
-from src.tool_factory import ToolFactory
-from src.agent_worker import AgentWorker
-from src.agent_runner import AgentRunner
 import logging
 
 # Redirect stdout/stderr to file for debugging
@@ -43,24 +43,42 @@ UPLOADS_DIR = os.path.join(os.getcwd(), "uploads")
 os.makedirs(CHATS_DIR, exist_ok=True)
 os.makedirs(UPLOADS_DIR, exist_ok=True)
 
-# ── Step 1: Document Processing ─────────────────────────────────
-processor = DocumentProcessor()
-doc_infos = processor.process_all()
+# Small pool for concurrent chat-file reads in GET /chats
+_io_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="chat-io")
+
+# ── Shared agent pipeline (built once per process) ──────────────
+# Spawned PDF-extraction workers re-run this script as __mp_main__; the
+# project import itself is guarded so they never import src.config
+# (torch, sentence-transformers, model loader thread, Groq client) or
+# start the embed batcher thread.
+# The pipeline is built in a background thread so a large corpus cannot
+# hold up the gunicorn worker past its timeout; /chat answers 503 until
+# it is ready.
+_runner = None
+_runner_error = None
+
 
-# ── Step 2: Tool Construction ───────────────────────────────────
-factory = ToolFactory()
-tools = factory.build_tools(doc_infos)
+def _build_runner():
+    global _runner, _runner_error
+    try:
+        from src.bootstrap import get_runner
+        _runner = get_runner()
+        print("[server] ✓ Agent pipeline ready")
+    except Exception as e:
+        _runner_error = e
+        print(f"[server] ✗ Agent pipeline failed to build: {e}")
+        raise
 
-# ── Step 3: Agent Initialization ────────────────────────────────
-worker = AgentWorker(tools)
-runner = AgentRunner(worker)
+
+if __name__ != "__mp_main__":
+    threading.Thread(target=_build_runner, name="build-runner", daemon=True).start()
 
 
 # ─── Hardcoded AI reply ───────────────────────────────────────────────────────
 
 def get_bot_reply(message, docs=None):
     query = message
-    answer = runner.run(query, allowed_docs=docs)
+    answer = _runner.run(query, allowed_docs=docs)
     return f"{answer}"
 
 # ─── POST /chat ───────────────────────────────────────────────────────────────
@@ -74,6 +92,11 @@ def chat():
     if not message.strip():
         return jsonify({"error": "Empty message"}), 400
 
+    if _runner is None:
+        if _runner_error is not None:
+            return jsonify({"error": f"Agent pipeline failed to start: {_runner_error}"}), 503
+        return jsonify({"error": "Agent pipeline is still starting, try again shortly"}), 503
+
     # docs contains the checked filenames — use them when wiring real AI
     print(f"[chat] message: {message}")
     print(f"[chat] active docs: {docs}")
@@ -91,16 +114,17 @@ def chat():
 
 # ─── GET /chats ───────────────────────────────────────────────────────────────
 
+def _read_chat(path):
+    with open(path, "rb") as f:
+        return orjson.loads(f.read())
+
+
 @app.route("/chats", methods=["GET"])
 def get_chats():
-    files = os.listdir(CHATS_DIR)
-    chats = []
-
-    for file in files:
-        if file.endswith(".json"):
-            with open(os.path.join(CHATS_DIR, file), "r") as f:
-                chats.append(json.load(f))
+    with os.scandir(CHATS_DIR) as it:
+        paths = [e.path for e in it if e.name.endswith(".json") and e.is_file()]
 
+    chats = list(_io_pool.map(_read_chat, paths))
     return jsonify(chats)
 
 
@@ -144,11 +168,16 @@ def upload_files():
 
 @app.route("/upload", methods=["GET"])
 def list_uploads():
-    files = os.listdir(UPLOADS_DIR)
+    with os.scandir(UPLOADS_DIR) as it:
+        files = [e.name for e in it]
     return jsonify({"files": files})
 
 
 # ─── Run ──────────────────────────────────────────────────────────────────────
 
+# Production: `gunicorn server:app` (see gunicorn.conf.py — one worker,
+# 16 threads sharing the model). The block below is the local dev server.
+
 if __name__ == "__main__":
-    app.run(port=8000, debug=True)
\ No newline at end of file
+    # The reloader would import this module twice and build the pipeline twice
+    app.run(port=8000, debug=True, threaded=True, use_reloader=False)
\ No newline at end of file
@@ -9,15 +9,40 @@ Orchestrates the full agentic RAG pipeline:
   5. Returns a final synthesized answer
 
 Supports multi-hop reasoning: the agent can call multiple tools
-across iterations, building up context incrementally.
+across iterations, building up context incrementally. Each query is one
+growing chat conversation (static system prompt, then assistant actions
+and tool results), so the LLM backend can reuse the shared prefix
+across steps instead of re-reading a rebuilt prompt. Responses are
+streamed and cut off as soon as a complete JSON action has arrived.
+
+Final answers are kept in a semantic response cache keyed on the query
+embedding, the allowed_docs filter and the query's numbers and quoted
+strings; near-duplicate questions with the same literals return the
+cached answer without running the loop.
 """
 
-import json
+import re
 from typing import List
 
-from src.config import llm_chat, MAX_REASONING_STEPS
+import orjson
+
+from src.config import (
+    embed_model,
+    llm_chat,
+    llm_chat_until,
+    MAX_REASONING_STEPS,
+    RESPONSE_CACHE_THRESHOLD,
+    RESPONSE_CACHE_SIZE,
+    RESPONSE_CACHE_TTL_S,
+)
 from src.agent_worker import AgentWorker
-from src.tool_factory import Tool
+from src.embed_batcher import batcher
+from src.semantic_cache import SemanticCache
+from src.tool_factory import Tool, query_template
+
+
+# Greedy match from the first "{" to the last "}" in an LLM response
+_JSON_RE = re.compile(r"\{.*\}", re.S)
 
 
 # ── System Prompt for the Reasoning Agent ──────────────────────────
@@ -30,8 +55,7 @@ no extra text.
 AVAILABLE TOOLS:
 {tool_list}
 
-CONTEXT GATHERED SO FAR:
-{context}
+Tool results are sent to you as user messages starting with "[Result from".
 
 RULES:
 1. If you need more information, call a tool by responding with:
@@ -53,6 +77,12 @@ class AgentRunner:
 
     def __init__(self, worker: AgentWorker):
         self.worker = worker
+        self._resp_cache = SemanticCache(
+            dim=embed_model.get_sentence_embedding_dimension(),
+            threshold=RESPONSE_CACHE_THRESHOLD,
+            capacity=RESPONSE_CACHE_SIZE,
+            ttl_seconds=RESPONSE_CACHE_TTL_S,
+        )
 
     def run(self, query: str, allowed_docs: List[str] = None) -> str:
         """
@@ -63,43 +93,53 @@ class AgentRunner:
         Returns the final answer string.
         """
         print(f"[Runner] received allowed_docs: {allowed_docs}")
+        q_vec = batcher.submit(query).result()
+        # Embeddings barely move when only a number or quoted name changes
+        # ("top 5" vs "top 10"), so those literals must match exactly too
+        _, literals = query_template(query)
+        cache_key = (
+            frozenset(allowed_docs) if allowed_docs else None,
+            tuple(literals.values()),
+        )
+
+        cached = self._resp_cache.lookup(q_vec, cache_key)
+        if cached is not None:
+            print("[Runner] ✓ Response cache hit")
+            return cached
+
+        answer = self._run_uncached(query, allowed_docs, q_vec)
+        self._resp_cache.store(q_vec, answer, cache_key)
+        return answer
+
+    def _run_uncached(self, query: str, allowed_docs: List[str], q_vec) -> str:
+        """Tool selection + reasoning loop for a query that missed the cache."""
         # ── Step 1: Tool Selection ──────────────────────────────────
-        selected_tools = self.worker.select_tools(query, allowed_docs=allowed_docs)
+        selected_tools = self.worker.select_tools(query, allowed_docs=allowed_docs, query_vec=q_vec)
         if not selected_tools:
             return "I couldn't find any relevant knowledge sources for your query."
 
-        tool_map = {t.name: t for t in selected_tools}
-        called_tools = set()
+        name_to_idx = {t.name: i for i, t in enumerate(selected_tools)}
+        called_idxs: set[int] = set()
         context_parts: List[str] = []
 
+        # The system prompt is fixed for the whole query; later steps only
+        # append messages so the conversation prefix stays identical.
+        tool_list_str = "\n".join(f"  - {t.name}: {t.description}" for t in selected_tools)
+        messages = [
+            {"role": "system", "content": AGENT_SYSTEM_PROMPT.format(tool_list=tool_list_str)},
+            {"role": "user", "content": f"USER QUESTION: {query}"},
+        ]
+
         # ── Step 2: Reasoning Loop ──────────────────────────────────
         for step in range(1, MAX_REASONING_STEPS + 1):
             print(f"\n{'='*60}")
             print(f"  REASONING STEP {step}/{MAX_REASONING_STEPS}")
             print(f"{'='*60}")
 
-            # Build tool list description for the prompt
-            tool_list_str = "\n".join(
-                f"  - {t.name}: {t.description}"
-                for t in selected_tools
-                if t.name not in called_tools
-            )
-            if not tool_list_str:
-                tool_list_str = "(All available tools have been called)"
-
-            # Build context string
-            context_str = "\n\n".join(context_parts) if context_parts else "(none yet)"
-
-            # Build prompt
-            system = AGENT_SYSTEM_PROMPT.format(
-                tool_list=tool_list_str,
-                context=context_str,
-            )
-            user_prompt = f"USER QUESTION: {query}"
-
             # ── LLM Decision ────────────────────────────────────────
-            raw_response = llm_chat(user_prompt, system_prompt=system)
+            raw_response = llm_chat_until(messages, self._has_action)
             print(f"\n[Agent] LLM Response:\n{raw_response[:500]}")
+            messages.append({"role": "assistant", "content": raw_response})
 
             # Parse JSON response
             action = self._parse_action(raw_response)
@@ -122,22 +162,35 @@ class AgentRunner:
                 print(f"\n[Agent] → Tool call: {tool_name}")
                 print(f"[Agent]   Reason: {reasoning}")
 
-                if tool_name in tool_map and tool_name not in called_tools:
-                    tool = tool_map[tool_name]
+                idx = name_to_idx.get(tool_name)
+                if idx is not None and idx not in called_idxs:
+                    tool = selected_tools[idx]
                     print(f"[Agent]   Executing {tool_name} ...")
                     result = tool.function(query)
-                    called_tools.add(tool_name)
-                    context_parts.append(
+                    called_idxs.add(idx)
+                    tool_result = (
                         f"[Result from {tool_name} ({tool.tool_type} on "
                         f"'{tool.document_name}')]:\n{result}"
                     )
+                    context_parts.append(tool_result)
+                    messages.append({"role": "user", "content": tool_result})
                     print(f"[Agent]   ✓ Got {len(result)} chars from {tool_name}")
-                elif tool_name in called_tools:
+                elif idx is not None:
                     print(f"[Agent]   ⚠ Tool '{tool_name}' already called — skipping")
+                    messages.append({"role": "user", "content": (
+                        f"Tool '{tool_name}' was already called. Use its result above "
+                        f"or call a different tool."
+                    )})
                 else:
                     print(f"[Agent]   ⚠ Tool '{tool_name}' not found in selected tools")
+                    messages.append({"role": "user", "content": (
+                        f"Tool '{tool_name}' is not in AVAILABLE TOOLS."
+                    )})
             else:
                 print(f"[Agent] ⚠ Unknown action type: {action.get('action')}")
+                messages.append({"role": "user", "content": (
+                    'Respond with an "action" of either "tool_call" or "final_answer".'
+                )})
 
         # ── Step 3: Fallback synthesis ──────────────────────────────
         print(f"\n[Agent] Max steps reached — synthesizing final answer ...\n")
@@ -145,24 +198,23 @@ class AgentRunner:
 
     # ── Helpers ─────────────────────────────────────────────────────
 
+    @classmethod
+    def _has_action(cls, partial: str) -> bool:
+        """True once a streamed response contains a complete JSON action."""
+        action = cls._parse_action(partial)
+        return isinstance(action, dict) and "action" in action
+
     @staticmethod
     def _parse_action(raw: str) -> dict | None:
         """Try to extract a JSON object from the LLM response."""
-        raw = raw.strip()
-        # Try direct parse
+        # One regex scan covers both bare JSON and JSON wrapped in prose/markdown
+        match = _JSON_RE.search(raw)
+        if match is None:
+            return None
         try:
-            return json.loads(raw)
-        except json.JSONDecodeError:
-            pass
-        # Try to find JSON in the text
-        start = raw.find("{")
-        end = raw.rfind("}") + 1
-        if start >= 0 and end > start:
-            try:
-                return json.loads(raw[start:end])
-            except json.JSONDecodeError:
-                pass
-        return None
+            return orjson.loads(match.group(0))
+        except orjson.JSONDecodeError:
+            return None
 
     @staticmethod
     def _synthesize_final(query: str, context_parts: List[str]) -> str:
@@ -2,16 +2,40 @@
 Agent Worker — semantic tool selection layer.
 
 Receives a user query, embeds it, and finds the top-K most relevant
-tools by comparing the query embedding against the persisted tool
-description embeddings in ChromaDB. Acts as a routing intelligence
-layer that narrows the search space before document-level retrieval.
+tools by comparing the query embedding against the tool description
+embeddings. Acts as a routing intelligence layer that narrows the
+search space before document-level retrieval.
+
+There is one vector per tool, taken from the embedding cache (which
+DocumentProcessor warms with the tool descriptions during ingest).
+They are loaded once into a normalized NumPy
+matrix, projected onto at most TOOL_PCA_DIM principal directions when
+that is exact or keeps TOOL_PCA_MIN_ENERGY of the energy, quantized to
+int8 with per-row scales, and scored with a single matrix-vector
+product per query instead of a ChromaDB round-trip. The int8 scan only
+shortlists 2·top_k candidates; those are re-ranked in float32.
+
+Near-duplicate queries are answered from an in-process semantic cache
+(normalized query embeddings → previously selected tool names), which
+skips the similarity scan entirely on a hit.
 """
 
-from typing import Dict, List
+import threading
+from typing import Dict, List, Optional
 
-import chromadb
+import numpy as np
 
-from src.config import embed_model, CHROMA_DB_DIR, TOP_K_TOOLS
+from src.config import (
+    embed_model,
+    TOP_K_TOOLS,
+    TOOL_PCA_DIM,
+    TOOL_PCA_MIN_ENERGY,
+    QUERY_CACHE_THRESHOLD,
+    QUERY_CACHE_SIZE,
+)
+from src import embed_cache
+from src.embed_batcher import batcher
+from src.semantic_cache import SemanticCache
 from src.tool_factory import Tool
 
 
@@ -20,42 +44,42 @@ class AgentWorker:
 
     def __init__(self, tools: List[Tool]):
         self.tools: Dict[str, Tool] = {t.name: t for t in tools}
-        self.chroma_client = chromadb.PersistentClient(path=str(CHROMA_DB_DIR))
-        self._td_collection = self.chroma_client.get_collection(
-            name="tool-descriptions"
+        self._load_tool_matrix()
+
+        # ── Semantic query cache ────────────────────────────────────
+        self._qcache = SemanticCache(
+            dim=embed_model.get_sentence_embedding_dimension(),
+            threshold=QUERY_CACHE_THRESHOLD,
+            capacity=QUERY_CACHE_SIZE,
         )
 
-    def select_tools(self, query: str, top_k: int = TOP_K_TOOLS, allowed_docs: List[str] = None) -> List[Tool]:
+        # Warm the encoder and scoring path off the startup thread so the
+        # first real request doesn't pay the one-off setup costs.
+        threading.Thread(target=self._warmup, name="worker-warmup", daemon=True).start()
+
+    def select_tools(self, query: str, top_k: int = TOP_K_TOOLS, allowed_docs: List[str] = None,
+                     query_vec: Optional[np.ndarray] = None) -> List[Tool]:
         """
         Embed the query and find the top-K tools whose descriptions
         are most semantically similar.
 
         If allowed_docs is provided, only search within those documents.
+        query_vec may be passed to reuse an already computed normalized embedding.
         """
-        query_embedding = embed_model.encode([query]).tolist()
+        q_vec = query_vec if query_vec is not None else batcher.submit(query).result()
+        docs_key = (frozenset(allowed_docs) if allowed_docs else None, top_k)
+
+        names = self._qcache.lookup(q_vec, docs_key)
+        if names is not None and all(n in self.tools for n in names):
+            print(f"\n[Worker] Query: \"{query}\" (cache hit)")
+            return [self.tools[n] for n in names]
 
-        # Build metadata filter if specific docs are requested
-        where_filter = {}
         if allowed_docs:
             print(f"[Worker] Filtering by docs: {allowed_docs}")
-            # ChromaDB $in operator for matching one of multiple values
-            where_filter = {"document_name": {"$in": allowed_docs}}
-
-        # Clamp top_k to total available tools (or count with filter if possible)
-        # Note: count() doesn't accept filters, so we just ask for top_k and let Chroma handle it
-        k = top_k 
 
-        results = self._td_collection.query(
-            query_embeddings=query_embedding,
-            n_results=k,
-            where=where_filter if where_filter else None,
-        )
+        selected = [self.tools[name] for name in self._top_k_tools(q_vec, top_k, allowed_docs)]
 
-        selected: List[Tool] = []
-        if results["ids"] and results["ids"][0]:
-            for tool_name in results["ids"][0]:
-                if tool_name in self.tools:
-                    selected.append(self.tools[tool_name])
+        self._qcache.store(q_vec, [t.name for t in selected], docs_key)
 
         # Log selection
         print(f"\n[Worker] Query: \"{query}\"")
@@ -64,3 +88,81 @@ class AgentWorker:
             print(f"  {i}. {t.name} ({t.tool_type}) — {t.document_name}")
 
         return selected
+
+    def _warmup(self) -> None:
+        try:
+            q_vec = batcher.submit("warmup").result()
+            self._top_k_tools(q_vec, 1, None)
+        except Exception as e:
+            print(f"[Worker] ⚠ Warmup failed: {e}")
+
+    # ── Local Tool-Description Index ────────────────────────────────
+
+    def _load_tool_matrix(self) -> None:
+        """Load the tool-description embeddings into a NumPy matrix."""
+        tools = list(self.tools.values())
+        dim = embed_model.get_sentence_embedding_dimension()
+        mat = embed_cache.get_or_compute([t.description for t in tools]).reshape(-1, dim)
+        norms = np.linalg.norm(mat, axis=1, keepdims=True)
+        self._td_mat: np.ndarray = np.ascontiguousarray(mat / np.maximum(norms, 1e-12))
+        # Uncentered PCA (truncated SVD) to at most TOOL_PCA_DIM dims. Dot
+        # products with the tools are preserved exactly when the tool count
+        # is <= TOOL_PCA_DIM, since queries are projected onto their span.
+        # With more tools the projection is lossy, so it is kept only if
+        # the retained singular values carry TOOL_PCA_MIN_ENERGY of the
+        # energy; otherwise the full-dimensional matrix is scanned.
+        self._pca_W: Optional[np.ndarray] = None
+        n_tools = self._td_mat.shape[0]
+        if 0 < n_tools <= TOOL_PCA_DIM:
+            _, _, vt = np.linalg.svd(self._td_mat, full_matrices=False)
+            self._pca_W = np.ascontiguousarray(vt[:n_tools], dtype=np.float32)
+        elif n_tools > TOOL_PCA_DIM:
+            _, sv, vt = np.linalg.svd(self._td_mat, full_matrices=False)
+            energy = sv ** 2
+            if energy[:TOOL_PCA_DIM].sum() >= TOOL_PCA_MIN_ENERGY * energy.sum():
+                self._pca_W = np.ascontiguousarray(vt[:TOOL_PCA_DIM], dtype=np.float32)
+        reduced = self._td_mat if self._pca_W is None else self._td_mat @ self._pca_W.T
+        # Symmetric per-row int8 quantization for the similarity scan
+        row_max = np.maximum(np.abs(reduced).max(axis=1, initial=0.0), 1e-12)
+        self._td_scale: np.ndarray = (row_max / 127.0).astype(np.float32)
+        self._td_i8: np.ndarray = np.ascontiguousarray(
+            np.round(reduced / self._td_scale[:, None]).astype(np.int8)
+        )
+        self._td_ids: List[str] = [t.name for t in tools]
+        self._td_docs: np.ndarray = np.asarray([t.document_name for t in tools], dtype=object)
+        self._doc_masks: Dict[frozenset, np.ndarray] = {}
+
+    def _doc_mask(self, allowed_docs: List[str]) -> np.ndarray:
+        """Boolean row mask for the allowed_docs filter, memoized per doc set."""
+        key = frozenset(allowed_docs)
+        mask = self._doc_masks.get(key)
+        if mask is None:
+            if len(self._doc_masks) >= 128:
+                self._doc_masks.clear()
+            mask = np.isin(self._td_docs, np.asarray(list(key), dtype=object))
+            self._doc_masks[key] = mask
+        return mask
+
+    def _top_k_tools(self, q_vec: np.ndarray, top_k: int,
+                     allowed_docs: Optional[List[str]]) -> List[str]:
+        """Return the names of the top-K tools by cosine similarity, best first."""
+        q_red = q_vec if self._pca_W is None else self._pca_W @ q_vec
+        q_scale = max(float(np.abs(q_red).max(initial=0.0)), 1e-12) / 127.0
+        q_i8 = np.round(q_red / q_scale).astype(np.int32)
+        sims = (self._td_i8 @ q_i8).astype(np.float32) * self._td_scale * q_scale
+        if allowed_docs:
+            mask = self._doc_mask(allowed_docs)
+            sims[~mask] = -np.inf
+            k = min(top_k, int(mask.sum()))
+        else:
+            k = min(top_k, len(sims))
+        if k <= 0:
+            return []
+        # Tool descriptions share boilerplate, so scores are often near-ties
+        # that int8 rounding can reorder: shortlist 2k candidates from the
+        # int8 scan, then rank them by exact float cosine
+        n_short = min(2 * k, int(np.isfinite(sims).sum()))
+        short = np.argpartition(-sims, n_short - 1)[:n_short]
+        exact = self._td_mat[short] @ q_vec
+        idx = short[np.argsort(-exact)[:k]]
+        return [self._td_ids[i] for i in idx]
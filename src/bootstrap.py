@@ -0,0 +1,45 @@
+"""
+Bootstrap — builds the shared agent pipeline once per process.
+
+Document processing, tool construction and agent initialization are
+expensive (ChromaDB clients, embeddings, LLM summaries), and the worker
+and runner hold the semantic caches. Entry points call get_runner()
+instead of wiring the pipeline themselves, so importing several of them
+never repeats the setup.
+"""
+
+import threading
+from typing import Optional
+
+from src.document_processor import DocumentProcessor
+from src.tool_factory import ToolFactory
+from src.agent_worker import AgentWorker
+from src.agent_runner import AgentRunner
+
+
+_lock = threading.Lock()
+_runner: Optional[AgentRunner] = None
+
+
+def _build() -> AgentRunner:
+    # ── Step 1: Document Processing ─────────────────────────────────
+    processor = DocumentProcessor()
+    doc_infos = processor.process_all(describe_tools=ToolFactory.tool_descriptions)
+
+    # ── Step 2: Tool Construction ───────────────────────────────────
+    factory = ToolFactory()
+    tools = factory.build_tools(doc_infos)
+
+    # ── Step 3: Agent Initialization ────────────────────────────────
+    worker = AgentWorker(tools)
+    return AgentRunner(worker)
+
+
+def get_runner() -> AgentRunner:
+    """Return the process-wide AgentRunner, building it on first call."""
+    global _runner
+    if _runner is None:
+        with _lock:
+            if _runner is None:
+                _runner = _build()
+    return _runner
@@ -0,0 +1,50 @@
+"""
+ChromaDB helpers used by the document processor.
+"""
+
+import sqlite3
+
+from src.config import CHROMA_DB_DIR, CHROMA_FAST_INGEST
+
+# Trade durability for ingest speed; the index can always be rebuilt from uploads/
+_FAST_INGEST_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=OFF",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA locking_mode=EXCLUSIVE",
+)
+
+
+def apply_fast_ingest_pragmas(client) -> None:
+    """
+    When CHROMA_FAST_INGEST is enabled, relax SQLite durability on the
+    client's metadata store to speed up bulk writes.
+
+    Python-backed Chroma clients (chromadb < 1.0) keep their SQLite sysdb
+    behind client._server, with a connection pool, so all pragmas are
+    applied there. Rust-backed clients (chromadb >= 1.0) open SQLite
+    internally and have no such object; for those only journal_mode=WAL
+    can be set, since it is persisted in the database file itself.
+    """
+    if not CHROMA_FAST_INGEST:
+        return
+    sysdb = getattr(getattr(client, "_server", None), "_sysdb", None)
+    conn_pool = getattr(sysdb, "_conn_pool", None)
+    if conn_pool is not None:
+        try:
+            conn = conn_pool.connect()
+            for pragma in _FAST_INGEST_PRAGMAS:
+                conn.execute(pragma)
+            print("[Chroma] ✓ Fast-ingest pragmas applied")
+        except Exception as e:
+            print(f"[Chroma] ⚠ Could not apply fast-ingest pragmas: {e}")
+        return
+
+    print("[Chroma] Client has no Python SQLite sysdb — fast ingest limited to WAL")
+    db_file = CHROMA_DB_DIR / "chroma.sqlite3"
+    if db_file.exists():
+        try:
+            with sqlite3.connect(str(db_file)) as conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+        except Exception as e:
+            print(f"[Chroma] ⚠ Could not enable WAL: {e}")
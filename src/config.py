@@ -5,9 +5,15 @@ SentenceTransformer embedding model, and defines project-wide paths.
 """
 
 import os
+import functools
+import threading
 from pathlib import Path
+from typing import Callable
+import chromadb
+from chromadb.config import Settings as ChromaSettings
 from dotenv import load_dotenv
 from groq import Groq
+import torch
 from sentence_transformers import SentenceTransformer
 
 # ── Load environment variables ──────────────────────────────────────
@@ -23,6 +29,20 @@ if not GROQ_API_KEY:
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 DATA_DIR = PROJECT_ROOT / "uploads"
 CHROMA_DB_DIR = PROJECT_ROOT / "chroma_db"
+VECTOR_STORE_DIR = CHROMA_DB_DIR / "vector_store"  # chunk vectors (memmap) + chunk table
+FRAME_CACHE_DIR = CHROMA_DB_DIR / "frames"          # Feather copies of tabular uploads
+
+# ── Vector Store Client ─────────────────────────────────────────────
+
+@functools.lru_cache(maxsize=1)
+def get_chroma_client() -> "chromadb.ClientAPI":
+    """Process-wide ChromaDB client; every component shares one SQLite/HNSW handle."""
+    CHROMA_DB_DIR.mkdir(parents=True, exist_ok=True)
+    return chromadb.PersistentClient(
+        path=str(CHROMA_DB_DIR),
+        settings=ChromaSettings(anonymized_telemetry=False),
+    )
+
 
 # ── LLM Client (Groq) ──────────────────────────────────────────────
 LLM_MODEL = "llama-3.3-70b-versatile"
@@ -31,33 +51,130 @@ LLM_TEMPERATURE = 0.0
 groq_client = Groq(api_key=GROQ_API_KEY)
 
 
-def llm_chat(prompt: str, system_prompt: str = "You are a helpful assistant.") -> str:
-    """Send a prompt to the Groq LLM and return the response text."""
+def llm_chat_messages(messages: list) -> str:
+    """Send a full chat message list to the Groq LLM and return the response text."""
     response = groq_client.chat.completions.create(
         model=LLM_MODEL,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": prompt},
-        ],
+        messages=messages,
         temperature=LLM_TEMPERATURE,
     )
     return response.choices[0].message.content
 
 
+def llm_chat_until(messages: list, is_complete: Callable[[str], bool]) -> str:
+    """
+    Stream a chat completion and stop as soon as is_complete(text_so_far)
+    returns True, closing the stream so no further tokens are generated.
+    Returns the text received up to that point (or the full response).
+    """
+    stream = groq_client.chat.completions.create(
+        model=LLM_MODEL,
+        messages=messages,
+        temperature=LLM_TEMPERATURE,
+        stream=True,
+    )
+    parts = []
+    try:
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            parts.append(delta)
+            if "}" in delta and is_complete("".join(parts)):
+                break
+    finally:
+        stream.close()
+    return "".join(parts)
+
+
+def llm_chat(prompt: str, system_prompt: str = "You are a helpful assistant.") -> str:
+    """Send a prompt to the Groq LLM and return the response text."""
+    return llm_chat_messages([
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": prompt},
+    ])
+
+
 # ── Embedding Model (local SentenceTransformer) ────────────────────
 EMBEDDING_MODEL_NAME = 'sentence-transformers/all-MiniLM-L6-v2'
+EMBEDDING_DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+
+
+
+class _ModelProxy:
+    """
+    Loads the SentenceTransformer in a background thread started at import
+    time, so weight loading overlaps with the rest of startup. Attribute
+    access blocks until the model is ready, then forwards to it.
+    """
+
+    def __init__(self, model_name: str):
+        self._model = None
+        self._error = None
+        self._ready = threading.Event()
+        threading.Thread(
+            target=self._load, args=(model_name,), name="embed-model-loader", daemon=True
+        ).start()
+
+    def _load(self, model_name: str) -> None:
+        try:
+            print(f"[Config] Loading embedding model: {model_name} ...")
+            self._model = SentenceTransformer(model_name, device=EMBEDDING_DEVICE)
+            if EMBEDDING_DEVICE == "cuda":
+                self._model.half()  # fp16 inference; callers cast outputs to float32
+            print(f"[Config] Embedding model loaded on {EMBEDDING_DEVICE} "
+                  f"(dim={self._model.get_sentence_embedding_dimension()})")
+        except Exception as e:
+            self._error = e
+        finally:
+            self._ready.set()
 
-print(f"[Config] Loading embedding model: {EMBEDDING_MODEL_NAME} ...")
-embed_model = SentenceTransformer(EMBEDDING_MODEL_NAME)
-print(f"[Config] Embedding model loaded (dim={embed_model.get_sentence_embedding_dimension()})")
+    def __getattr__(self, name):
+        self._ready.wait()
+        if self._error is not None:
+            raise RuntimeError(f"Embedding model failed to load: {self._error}") from self._error
+        return getattr(self._model, name)
+
+
+embed_model = _ModelProxy(EMBEDDING_MODEL_NAME)
+
+# ── Query Embedding Batching ───────────────────────────────────────
+EMBED_MAX_BATCH = 32        # max queries coalesced into one encode call
+EMBED_MAX_LATENCY_MS = 10   # max wait for a batch to fill
+EMBED_BATCH_SIZE = 256      # texts per forward pass for bulk (chunk / tool description) encodes
 
 # ── Chunking Parameters ────────────────────────────────────────────
-CHUNK_SIZE = 512          # tokens (approx chars / 4)
+CHUNK_SIZE = 512          # tokens per chunk, capped at the embedding model's max_seq_length
 CHUNK_OVERLAP = 50        # token overlap between chunks
-MAX_CHUNK_CHARS = 2048    # character-based chunk size
+MAX_CHUNK_CHARS = 2048    # character-based chunk size (fallback without a fast tokenizer)
 CHUNK_OVERLAP_CHARS = 200 # character-based overlap
+SUMMARY_INPUT_CHARS = 6000  # max document text sent to the LLM for the summary
+SUMMARY_SENTENCES_PER_CHUNK = 2  # extractive sentences kept per chunk for long documents
+TABULAR_SAMPLE_ROWS = 1000  # rows read to infer schema/sample of CSV/Excel files
+
+# ── PDF Extraction ─────────────────────────────────────────────────
+PDF_WORKERS = min(os.cpu_count() or 1, 4)  # process-pool size for page extraction
+PDF_PARALLEL_MIN_PAGES = 32                # smaller PDFs are extracted in one pool task
+
+# ── Ingestion ──────────────────────────────────────────────────────
+INGEST_WORKERS = 4        # documents prepared (extract/chunk/summarize) concurrently
+INGEST_PREFETCH = 2       # files read + hashed ahead of the busy prepare workers
+CHROMA_FAST_INGEST = os.environ.get("CHROMA_FAST_INGEST", "0") == "1"  # relax SQLite durability during ingest
 
 # ── Agent Parameters ───────────────────────────────────────────────
 TOP_K_TOOLS = 3           # number of tools selected by the agent worker
+TOOL_PCA_DIM = 96         # reduced dimension for the tool-selection scan
+TOOL_PCA_MIN_ENERGY = 0.99  # above TOOL_PCA_DIM tools, project only if this much energy is kept
 TOP_K_CHUNKS = 5          # number of chunks retrieved per vector search
 MAX_REASONING_STEPS = 3   # max iterations in the reasoning loop
+
+# ── Semantic Query Cache ───────────────────────────────────────────
+QUERY_CACHE_THRESHOLD = 0.92  # min cosine similarity for a cache hit
+QUERY_CACHE_SIZE = 512        # max cached queries before LRU eviction
+RESPONSE_CACHE_THRESHOLD = 0.92  # min cosine similarity to reuse a final answer
+RESPONSE_CACHE_SIZE = 256        # max cached answers before LRU eviction
+RESPONSE_CACHE_TTL_S = 3600      # cached answers expire after this many seconds
+PANDAS_CODE_CACHE_SIZE = 512     # generated pandas programs kept per (query template, schema)
+PANDAS_TRACEBACKS = os.environ.get("PANDAS_TRACEBACKS", "0") == "1"  # full tracebacks in pandas tool errors
@@ -1,11 +1,11 @@
 """
-Document Processor — reads, chunks, and persists documents to ChromaDB.
+Document Processor — reads, chunks, and persists documents to the vector store.
 
 For each document in the Data/ folder:
   1. Extract full text (PDF via PyMuPDF, TXT/MD as-is)
-  2. Chunk into overlapping segments
-  3. Embed chunks with SentenceTransformer
-  4. Store in a per-document ChromaDB collection
+  2. Chunk into overlapping token windows sized to the embedding model (content-addressed ids)
+  3. Embed only chunks not already in the vector store, with SentenceTransformer
+  4. Sync the document's chunks in the shared vector store (add new, delete removed)
   5. Generate an LLM summary of the full document (or structure summary for CSV/Excel)
 
 TABULAR DATA SUPPORT:
@@ -13,26 +13,51 @@ TABULAR DATA SUPPORT:
   - They are NOT chunked or embedded in ChromaDB
   - Instead, their dataframe structure (columns, types, sample rows) is analyzed
   - This allows the pandas data analysis tool to work on them directly
+
+STARTUP CACHE:
+  - A manifest of (filename, mtime, size) for DATA_DIR is kept in CHROMA_DB_DIR
+  - If it matches on startup, the pickled DocumentInfo list is returned as-is
+    without hashing files or touching ChromaDB
 """
 
 import re
+import copy
+import pickle
+import functools
 import hashlib
-from dataclasses import dataclass
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional, Tuple, Union
 
-import fitz  # PyMuPDF
+import numpy as np
+import orjson
 import pandas as pd
-import chromadb
 
 from src.config import (
+    get_chroma_client,
     embed_model,
     llm_chat,
     DATA_DIR,
     CHROMA_DB_DIR,
+    CHUNK_SIZE,
+    CHUNK_OVERLAP,
     MAX_CHUNK_CHARS,
     CHUNK_OVERLAP_CHARS,
+    PDF_WORKERS,
+    PDF_PARALLEL_MIN_PAGES,
+    INGEST_WORKERS,
+    INGEST_PREFETCH,
+    SUMMARY_INPUT_CHARS,
+    SUMMARY_SENTENCES_PER_CHUNK,
+    TABULAR_SAMPLE_ROWS,
 )
+from src import embed_cache
+from src.chroma_utils import apply_fast_ingest_pragmas
+from src.pdf_worker import count_pages, extract_pages
+from src.vector_store import get_vector_store
 
 
 # ── Data Classes ────────────────────────────────────────────────────
@@ -44,81 +69,327 @@ class DocumentInfo:
     slug: str               # sanitized name for collection IDs
     summary: str            # LLM-generated summary (or schema summary)
     chunk_count: int        # number of chunks stored (0 for tabular)
-    collection_name: str    # ChromaDB collection name (or "tabular_data")
+    collection_name: str    # index label, "doc_<slug>" (or "tabular_data"); chunks live in the vector store
     is_tabular: bool = False # Flag for CSV/Excel files
     file_path: Optional[str] = None # Path to the file for pandas loading
 
+    @functools.cached_property
+    def snippet(self) -> str:
+        """Summary excerpt used in this document's tool descriptions."""
+        return self.summary[:200].replace("\n", " ")
+
+
+@dataclass
+class _PreparedDoc:
+    """A changed document after extraction/summary, awaiting embedding + persistence."""
+    file_path: Path
+    slug: str
+    collection_name: str
+    file_hash: str
+    is_tabular: bool
+    chunks: List[str]       # unique chunks in document order; empty for tabular files
+    summary: str
+    chunk_ids: List[str] = field(default_factory=list)   # content-addressed id per chunk
+    new_idx: List[int] = field(default_factory=list)     # chunks not yet in the collection
+    stale_ids: List[str] = field(default_factory=list)   # stored chunks no longer present
+    moved: Dict[str, int] = field(default_factory=dict)  # kept chunk id -> new chunk_index
+
+    def to_info(self) -> DocumentInfo:
+        return DocumentInfo(
+            name=self.file_path.name,
+            slug=self.slug,
+            summary=self.summary,
+            chunk_count=len(self.chunks),
+            collection_name=self.collection_name,
+            is_tabular=self.is_tabular,
+            file_path=str(self.file_path),
+        )
+
 
 # ── Helpers ─────────────────────────────────────────────────────────
 
+_SLUG_RE = re.compile(r"[^a-z0-9]+")
+
+
 def _slugify(name: str) -> str:
     """Convert filename to a safe collection slug."""
     stem = Path(name).stem
-    slug = re.sub(r"[^a-z0-9]+", "_", stem.lower()).strip("_")
+    slug = _SLUG_RE.sub("_", stem.lower()).strip("_")
     # ChromaDB collection names must be 3-63 chars and start/end with alphanumeric
     if len(slug) < 3:
         slug = slug + "_doc"
     return slug[:63]
 
 
-def _extract_text(file_path: Path) -> str:
-    """Extract text from a file (PDF, TXT, or MD)."""
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+_pdf_pool_lock = threading.Lock()
+
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    """Process pool for PDF page extraction, created once and reused."""
+    global _pdf_pool
+    # Concurrent prepare threads may get here together; only one creates it
+    if _pdf_pool is None:
+        with _pdf_pool_lock:
+            if _pdf_pool is None:
+                _pdf_pool = ProcessPoolExecutor(
+                    max_workers=PDF_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _pdf_pool
+
+
+def _extract_pdf(file_path: Path) -> str:
+    """
+    Extract PDF text in the process pool, splitting large documents into
+    page ranges across workers. MuPDF keeps one global context with no
+    locking, so documents prepared on concurrent threads never call fitz
+    in this process: the page count and small PDFs are single pool tasks.
+    Workers open the path, which is served from the page cache.
+    """
+    pool = _get_pdf_pool()
+    path = str(file_path)
+    page_count = pool.submit(count_pages, path).result()
+
+    if PDF_WORKERS <= 1 or page_count < PDF_PARALLEL_MIN_PAGES:
+        return pool.submit(extract_pages, path, 0, page_count).result()
+
+    step = -(-page_count // PDF_WORKERS)  # ceil division
+    starts = list(range(0, page_count, step))
+    ends = [min(s + step, page_count) for s in starts]
+    parts = pool.map(extract_pages, [path] * len(starts), starts, ends)
+    return "\n".join(parts)
+
+
+def _extract_text(file_path: Path, data: Optional[bytes] = None) -> str:
+    """Extract text from a file (PDF, TXT, or MD), reusing already-read text bytes if given."""
     suffix = file_path.suffix.lower()
     if suffix == ".pdf":
-        doc = fitz.open(str(file_path))
-        text = "\n".join(page.get_text() for page in doc)
-        doc.close()
-        return text
+        return _extract_pdf(file_path)
     elif suffix in (".txt", ".md", ".csv"): # Simple read for text/csv debug/view
+        if data is not None:
+            return data.decode("utf-8", errors="replace")
         return file_path.read_text(encoding="utf-8", errors="replace")
     else:
         # Excel/Binary shouldn't be extracted as raw text
         return f"[Binary file: {file_path.name}]"
 
 
+def _read_excel(file_path: Path, **kwargs) -> pd.DataFrame:
+    """Read an Excel file with the Rust-backed calamine engine when installed."""
+    try:
+        return pd.read_excel(file_path, engine="calamine", **kwargs)
+    except (ImportError, ValueError):
+        return pd.read_excel(file_path, **kwargs)
+
+
+def _count_csv_rows(file_path: Path) -> int:
+    """Count data rows (lines minus header) in 1 MiB binary reads."""
+    lines = 0
+    last = b"\n"
+    with open(file_path, "rb") as f:
+        for buf in iter(lambda: f.read(1 << 20), b""):
+            lines += buf.count(b"\n")
+            last = buf[-1:]
+    if last != b"\n":
+        lines += 1  # final line without a trailing newline
+    return max(lines - 1, 0)
+
+
+def _count_xlsx_rows(file_path: Path) -> Optional[int]:
+    """Data rows in the first sheet from the workbook's dimensions, if recorded."""
+    try:
+        import openpyxl
+        wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            max_row = wb.worksheets[0].max_row
+        finally:
+            wb.close()
+        return max(max_row - 1, 0) if max_row else None
+    except Exception:
+        return None
+
+
+def _sample_rows_csv(df: pd.DataFrame, n_rows: int = 3, max_cols: int = 40) -> str:
+    """CSV-style header + first rows, limited to the first max_cols columns."""
+    sample = df.iloc[:n_rows, :max_cols]
+    lines = [",".join(map(str, sample.columns))]
+    lines.extend(",".join(map(str, row)) for row in sample.itertuples(index=False, name=None))
+    if df.shape[1] > max_cols:
+        lines.append(f"(+{df.shape[1] - max_cols} more columns)")
+    return "\n".join(lines)
+
+
 def _analyze_tabular(file_path: Path) -> str:
     """Load tabular data and return a text summary of its structure."""
     try:
+        # Schema and sample come from the first rows only; the row count is
+        # taken without parsing the whole file.
         suffix = file_path.suffix.lower()
         if suffix == ".csv":
-            df = pd.read_csv(file_path)
+            df = pd.read_csv(file_path, nrows=TABULAR_SAMPLE_ROWS)
+            n_rows = _count_csv_rows(file_path)
         else:
-            df = pd.read_excel(file_path)
+            df = _read_excel(file_path, nrows=TABULAR_SAMPLE_ROWS)
+            n_rows = _count_xlsx_rows(file_path) if suffix == ".xlsx" else None
+            if n_rows is None:
+                n_rows = len(_read_excel(file_path, usecols=[0]))
             
         buffer = []
         buffer.append(f"File: {file_path.name}")
-        buffer.append(f"Rows: {len(df)}, Columns: {len(df.columns)}")
+        buffer.append(f"Rows: {n_rows}, Columns: {len(df.columns)}")
         buffer.append("\nColumns and Data Types:")
         for col, dtype in df.dtypes.items():
             buffer.append(f"  - {col}: {dtype}")
         
         buffer.append("\nSample Data (first 3 rows):")
-        buffer.append(df.head(3).to_markdown(index=False))
+        buffer.append(_sample_rows_csv(df))
         
         return "\n".join(buffer)
     except Exception as e:
         return f"Error analyzing tabular file: {str(e)}"
 
 
-def _chunk_text(text: str, chunk_size: int = MAX_CHUNK_CHARS,
-                overlap: int = CHUNK_OVERLAP_CHARS) -> List[str]:
+_CHUNK_TOKENIZER_LOCK = threading.Lock()
+
+
+@functools.lru_cache(maxsize=1)
+def _get_chunk_tokenizer():
+    """
+    Private copy of the embedding model's fast tokenizer, or None if it is
+    unavailable. A copy is used so chunking (with truncation off) never
+    changes settings on the tokenizer the model encodes with concurrently.
+    """
+    try:
+        tokenizer = embed_model.tokenizer
+        return copy.deepcopy(tokenizer) if getattr(tokenizer, "is_fast", False) else None
+    except Exception as e:
+        print(f"[Processor] ⚠ Tokenizer unavailable, chunking by characters: {e}")
+        return None
+
+
+def _chunk_text(text: str, chunk_size: int = CHUNK_SIZE,
+                overlap: int = CHUNK_OVERLAP) -> List[str]:
+    """
+    Split text into overlapping token windows that fit the embedding
+    model's max sequence length, so chunks are neither truncated nor
+    mostly padding. Windows are mapped back to the original text through
+    token offsets. Falls back to character chunks without a fast tokenizer.
+    """
+    tokenizer = _get_chunk_tokenizer()
+    if tokenizer is None:
+        return _chunk_text_chars(text)
+
+    window = max(1, min(chunk_size, embed_model.max_seq_length) - 2)  # room for [CLS]/[SEP]
+    with _CHUNK_TOKENIZER_LOCK:
+        offsets = tokenizer(
+            text, add_special_tokens=False, return_offsets_mapping=True, verbose=False
+        )["offset_mapping"]
+    n = len(offsets)
+    step = max(1, window - overlap)
+    stripped = (
+        text[offsets[s][0]:offsets[min(s + window, n) - 1][1]].strip()
+        for s in range(0, max(n - overlap, 1), step)
+    ) if n else iter(())
+    chunks = list(filter(None, stripped))
+    return chunks if chunks else [text.strip() or "(empty document)"]
+
+
+def _chunk_text_chars(text: str, chunk_size: int = MAX_CHUNK_CHARS,
+                      overlap: int = CHUNK_OVERLAP_CHARS) -> List[str]:
     """Split text into overlapping character-based chunks."""
-    chunks = []
-    start = 0
-    while start < len(text):
-        end = start + chunk_size
-        chunk = text[start:end]
-        if chunk.strip():
-            chunks.append(chunk.strip())
-        start += chunk_size - overlap
+    step = chunk_size - overlap
+    stripped = (text[s:s + chunk_size].strip() for s in range(0, len(text), step))
+    chunks = list(filter(None, stripped))
     return chunks if chunks else [text.strip() or "(empty document)"]
 
 
+def _chunk_id(slug: str, chunk: str) -> str:
+    """Content-addressed chunk id: unchanged text keeps its id across edits."""
+    digest = hashlib.blake2b(chunk.encode("utf-8"), digest_size=16).hexdigest()
+    return f"{slug}_{digest}"
+
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+_WORD_RE = re.compile(r"[a-z0-9]{3,}")
+
+
+def _map_summarize(chunk: str, n_sentences: int = SUMMARY_SENTENCES_PER_CHUNK) -> str:
+    """Extractive summary of one chunk: its highest-scoring sentences, in order."""
+    sentences = [s.strip() for s in _SENTENCE_RE.split(chunk) if s.strip()]
+    if len(sentences) <= n_sentences:
+        return " ".join(sentences)
+    freq: Dict[str, int] = {}
+    sent_words = [_WORD_RE.findall(s.lower()) for s in sentences]
+    for words in sent_words:
+        for w in words:
+            freq[w] = freq.get(w, 0) + 1
+    scores = [sum(freq[w] for w in words) / (len(words) or 1) for words in sent_words]
+    top = sorted(sorted(range(len(sentences)), key=scores.__getitem__, reverse=True)[:n_sentences])
+    return " ".join(sentences[i] for i in top)
+
+
+def _summary_input(full_text: str, chunks: List[str]) -> str:
+    """
+    Text handed to the LLM summary call. Short documents go in whole; longer
+    ones are reduced to a few extractive sentences per chunk (map step), so
+    the single LLM call (reduce step) sees the whole document, not its head.
+    """
+    if len(full_text) <= SUMMARY_INPUT_CHARS:
+        return full_text
+    digest = "\n".join(_map_summarize(c) for c in chunks)
+    if len(digest) > SUMMARY_INPUT_CHARS:
+        digest = "\n".join(_map_summarize(c, 1) for c in chunks)
+    if len(digest) > SUMMARY_INPUT_CHARS:
+        # Still too long: keep evenly spaced sections across the document
+        lines = digest.split("\n")
+        keep = max(1, len(lines) * SUMMARY_INPUT_CHARS // len(digest))
+        stride = len(lines) / keep
+        digest = "\n".join(lines[int(i * stride)] for i in range(keep))
+    return digest
+
+
+def _data_manifest(files: List[Path]) -> List[list]:
+    """Cheap fingerprint of the input files: (name, mtime_ns, size) per file."""
+    manifest = []
+    for f in sorted(files):
+        st = f.stat()
+        manifest.append([f.name, st.st_mtime_ns, st.st_size])
+    return manifest
+
+
+def _read_and_hash(file_path: Path) -> Tuple[bytes, str]:
+    """Read a file once, returning its bytes and the same hash as _file_hash."""
+    h = hashlib.blake2b(digest_size=32)
+    parts: List[bytes] = []
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+            parts.append(chunk)
+    # One copy into the result; a growing bytearray plus bytes() made two
+    return b"".join(parts), h.hexdigest()
+
+
+def _read_for_prepare(file_path: Path, is_tabular: bool) -> Tuple[Optional[bytes], str]:
+    """
+    Plain-text documents are read once for both hashing and extraction.
+    Tabular files are only sampled later and PDFs are parsed by the pool
+    workers from their path, so those are just hashed (bytes = None).
+    """
+    if is_tabular or file_path.suffix.lower() == ".pdf":
+        return None, _file_hash(file_path)
+    return _read_and_hash(file_path)
+
+
 def _file_hash(file_path: Path) -> str:
-    """Compute MD5 hash of a file for change detection."""
-    h = hashlib.md5()
+    """
+    Compute a BLAKE2b hash of a file for change detection, streamed in
+    1 MiB reads. Stored hashes from the old MD5 scheme simply won't match,
+    which triggers a one-time reprocess.
+    """
+    h = hashlib.blake2b(digest_size=32)
     with open(file_path, "rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
+        for chunk in iter(lambda: f.read(1 << 20), b""):
             h.update(chunk)
     return h.hexdigest()
 
@@ -128,16 +399,30 @@ def _file_hash(file_path: Path) -> str:
 class DocumentProcessor:
     """Process all documents in DATA_DIR and persist to ChromaDB."""
 
+    MANIFEST_PATH = CHROMA_DB_DIR / "manifest.json"
+    INFOS_CACHE_PATH = CHROMA_DB_DIR / "doc_infos.pkl"
+
     def __init__(self):
         CHROMA_DB_DIR.mkdir(parents=True, exist_ok=True)
-        self.chroma_client = chromadb.PersistentClient(path=str(CHROMA_DB_DIR))
+        self.chroma_client = get_chroma_client()
+        apply_fast_ingest_pragmas(self.chroma_client)
         # Metadata collection tracks which files have been processed
         self._meta_collection = self.chroma_client.get_or_create_collection(
             name="document-meta"
         )
 
-    def process_all(self) -> List[DocumentInfo]:
-        """Process every supported file in DATA_DIR. Returns DocumentInfo list."""
+    def process_all(self, workers: Optional[int] = None,
+                    describe_tools: Optional[Callable[[List[DocumentInfo]], List[str]]] = None
+                    ) -> List[DocumentInfo]:
+        """
+        Process every supported file in DATA_DIR. Returns DocumentInfo list.
+
+        workers: number of files prepared concurrently (default INGEST_WORKERS).
+        describe_tools: optional callback (e.g. ToolFactory.tool_descriptions)
+            whose texts are embedded in the same encode call as the new
+            chunks, warming the embed cache that AgentWorker loads tool
+            vectors from.
+        """
         supported_text = {".pdf", ".txt", ".md"}
         supported_tabular = {".csv", ".xls", ".xlsx"}
         
@@ -148,27 +433,115 @@ class DocumentProcessor:
             print(f"[Processor] No supported documents found in {DATA_DIR}")
             return []
 
+        manifest = _data_manifest(files)
+        cached = self._load_cached_infos(manifest)
+        if cached is not None:
+            print(f"[Processor] ✓ {len(cached)} document(s) unchanged since last run — using cache.")
+            return cached
+
+        # Stage 1: prepare files concurrently (I/O, PDF pool, LLM summaries).
+        # A single prefetch thread reads and hashes files in order, staying
+        # at most INGEST_PREFETCH files ahead of the busy prepare workers so
+        # disk reads overlap with extraction and LLM waits.
+        files = sorted(files)
+        n_workers = max(1, workers or INGEST_WORKERS)
+        slots = threading.BoundedSemaphore(n_workers + INGEST_PREFETCH)
+        futures: List[Future] = []
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch") as io, \
+                ThreadPoolExecutor(max_workers=n_workers) as pool:
+            for f in files:
+                slots.acquire()
+                is_tabular = f.suffix.lower() in supported_tabular
+                read = io.submit(_read_for_prepare, f, is_tabular)
+                fut = pool.submit(self._prepare_one, f, is_tabular, read)
+                fut.add_done_callback(lambda _: slots.release())
+                futures.append(fut)
+            prepared = [fut.result() for fut in futures]
+
+        # Stage 2: one batched encode over every new chunk of every document,
+        # plus the tool descriptions when any document changed
+        pending = [p for p in prepared if isinstance(p, _PreparedDoc)]
+        all_chunks = [p.chunks[i] for p in pending for i in p.new_idx]
+        tool_texts: List[str] = []
+        if describe_tools is not None and pending:
+            tool_texts = describe_tools([p if isinstance(p, DocumentInfo) else p.to_info() for p in prepared])
+        all_embeddings = None
+        if all_chunks or tool_texts:
+            print(f"[Processor] Embedding {len(all_chunks)} chunk(s) from {len(pending)} document(s) "
+                  f"and {len(tool_texts)} tool description(s) ...")
+            all_embeddings = embed_cache.get_or_compute(
+                all_chunks + tool_texts, show_progress_bar=True
+            )[:len(all_chunks)]
+
+        # Stage 3: persist sequentially in this thread, slicing each
+        # document's rows out of the batched embeddings in order
         results: List[DocumentInfo] = []
-        for file_path in sorted(files):
-            is_tabular = file_path.suffix.lower() in supported_tabular
-            info = self._process_one(file_path, is_tabular)
-            results.append(info)
-
+        offset = 0
+        for p in prepared:
+            if isinstance(p, DocumentInfo):
+                results.append(p)
+                continue
+            end = offset + len(p.new_idx)
+            embeddings = all_embeddings[offset:end] if p.new_idx else None
+            results.append(self._persist_one(p, embeddings))
+            offset = end
+
+        self._save_cached_infos(manifest, results)
         print(f"\n[Processor] Processed {len(results)} document(s) total.\n")
         return results
 
-    # ── Per-document processing ─────────────────────────────────────
+    # ── Startup cache ───────────────────────────────────────────────
+
+    def _load_cached_infos(self, manifest: List[list]) -> Optional[List[DocumentInfo]]:
+        """Return the pickled DocumentInfo list if the data manifest is unchanged."""
+        try:
+            stored = orjson.loads(self.MANIFEST_PATH.read_bytes())
+            if stored != manifest:
+                return None
+            with open(self.INFOS_CACHE_PATH, "rb") as f:
+                infos = pickle.load(f)
+            store = get_vector_store()
+            if any(not i.is_tabular and store.count(i.name) == 0 for i in infos):
+                return None
+            return infos
+        except Exception:
+            return None
+
+    def _save_cached_infos(self, manifest: List[list], infos: List[DocumentInfo]) -> None:
+        """Persist the manifest and DocumentInfo list for the next startup."""
+        try:
+            with open(self.INFOS_CACHE_PATH, "wb") as f:
+                pickle.dump(infos, f)
+            self.MANIFEST_PATH.write_bytes(orjson.dumps(manifest))
+        except Exception as e:
+            print(f"[Processor] ⚠ Could not write startup cache: {e}")
 
-    def _process_one(self, file_path: Path, is_tabular: bool) -> DocumentInfo:
+    # ── Per-document processing ─────────────────────────────────────
+    #
+    # Each file goes through two stages:
+    #   _prepare_one  — hash, skip check, extract, chunk, LLM summary.
+    #                   Independent per file; run concurrently in threads.
+    #   _persist_one  — write ChromaDB, upsert metadata. Run sequentially
+    #                   after a single batched encode over all documents'
+    #                   chunks, so one model call and one Chroma client
+    #                   serve every document.
+
+    def _prepare_one(self, file_path: Path, is_tabular: bool,
+                     read: Optional[Future] = None) -> Union[DocumentInfo, _PreparedDoc]:
+        """read: optional prefetched _read_for_prepare result for this file."""
         slug = _slugify(file_path.name)
         collection_name = f"doc_{slug}" if not is_tabular else "tabular_data"
-        current_hash = _file_hash(file_path)
+        data, current_hash = read.result() if read is not None else _read_for_prepare(file_path, is_tabular)
 
         # Check if already processed and unchanged
         existing = self._meta_collection.get(ids=[slug])
         if existing and existing["documents"] and len(existing["documents"]) > 0:
             stored_meta = existing["metadatas"][0] if existing["metadatas"] else {}
-            if stored_meta.get("file_hash") == current_hash:
+            # Text documents also need their chunks in the vector store
+            # (e.g. not the case for data indexed before it existed)
+            if stored_meta.get("file_hash") == current_hash and (
+                is_tabular or get_vector_store().count(file_path.name) > 0
+            ):
                 print(f"[Processor] ✓ '{file_path.name}' already processed — skipping.")
                 return DocumentInfo(
                     name=file_path.name,
@@ -182,17 +555,20 @@ class DocumentProcessor:
 
         # ── Full processing pipeline ────────────────────────────────
         print(f"[Processor] Processing '{file_path.name}' (Tabular: {is_tabular}) ...")
-        
-        chunk_count = 0
-        summary = ""
+
+        chunks: List[str] = []
+        chunk_ids: List[str] = []
+        new_idx: List[int] = []
+        stale_ids: List[str] = []
+        moved: Dict[str, int] = {}
 
         if is_tabular:
             # For tabular data: Analyze structure, skip chunking/embedding
-            print(f"  → Analyzing tabular structure ...")
+            print(f"  → [{file_path.name}] Analyzing tabular structure ...")
             structure_summary = _analyze_tabular(file_path)
-            
+
             # Generate a semantic summary of what the data contains
-            print(f"  → Generating dataset description ...")
+            print(f"  → [{file_path.name}] Generating dataset description ...")
             summary_prompt = (
                 "You are a data analyst. Describe the contents of this dataset based on its schema and sample rows. "
                 "Identify what entities, metrics, and time periods it covers.\n\n"
@@ -200,71 +576,95 @@ class DocumentProcessor:
                 "DATASET DESCRIPTION:"
             )
             summary = llm_chat(summary_prompt)
-            chunk_count = 0
-            
+
             # Note: We don't delete/recreate a collection for tabular data as we don't store chunks
         else:
-            # For text documents: Extract, Chunk, Embed
+            # For text documents: Extract, Chunk (embedding happens in _persist_one)
             # 1. Extract text
-            full_text = _extract_text(file_path)
-            print(f"  → Extracted {len(full_text)} characters")
-
-            # 2. Chunk
-            chunks = _chunk_text(full_text)
-            print(f"  → Created {len(chunks)} chunks")
-            chunk_count = len(chunks)
-
-            # 3. Embed chunks
-            print(f"  → Generating embeddings ...")
-            embeddings = embed_model.encode(chunks, show_progress_bar=False).tolist()
-
-            # 4. Store in ChromaDB (per-document collection)
-            try:
-                self.chroma_client.delete_collection(name=collection_name)
-            except Exception:
-                pass
-            collection = self.chroma_client.create_collection(name=collection_name)
-
-            ids = [f"{slug}_chunk_{i}" for i in range(len(chunks))]
-            metadatas = [{"source": file_path.name, "chunk_index": i} for i in range(len(chunks))]
-            collection.add(
-                ids=ids,
-                documents=chunks,
-                embeddings=embeddings,
-                metadatas=metadatas,
-            )
-            print(f"  → Stored {len(chunks)} chunks in collection '{collection_name}'")
-
-            # 5. Generate summary via LLM
-            print(f"  → Generating document summary ...")
+            full_text = _extract_text(file_path, data)
+            data = None
+            print(f"  → [{file_path.name}] Extracted {len(full_text)} characters")
+
+            # 2. Chunk (dropping exact duplicates, which would share an id)
+            chunk_ids: List[str] = []
+            seen = set()
+            for chunk in _chunk_text(full_text):
+                cid = _chunk_id(slug, chunk)
+                if cid not in seen:
+                    seen.add(cid)
+                    chunks.append(chunk)
+                    chunk_ids.append(cid)
+            print(f"  → [{file_path.name}] Created {len(chunks)} chunks")
+
+            # Diff against what the vector store already holds
+            stored_index = get_vector_store().chunk_index(file_path.name)
+            new_idx = [i for i, cid in enumerate(chunk_ids) if cid not in stored_index]
+            stale_ids = [cid for cid in stored_index if cid not in seen]
+            moved = {
+                cid: i for i, cid in enumerate(chunk_ids)
+                if cid in stored_index and stored_index[cid] != i
+            }
+            print(f"  → [{file_path.name}] {len(new_idx)} new, {len(stale_ids)} removed, "
+                  f"{len(chunks) - len(new_idx)} unchanged chunk(s)")
+
+            # 3. Generate summary via LLM
+            print(f"  → [{file_path.name}] Generating document summary ...")
+            summary_input = _summary_input(full_text, chunks)
+            label = ("DOCUMENT TEXT" if summary_input is full_text
+                     else "KEY SENTENCES FROM EACH SECTION OF THE DOCUMENT (in order)")
             summary_prompt = (
                 "You are a document analyst. Provide a comprehensive summary of the "
                 "following document. Cover all major topics, themes, and key information.\n\n"
-                f"DOCUMENT TEXT (first 6000 chars):\n{full_text[:6000]}\n\n"
+                f"{label}:\n{summary_input}\n\n"
                 "SUMMARY:"
             )
             summary = llm_chat(summary_prompt)
 
+        return _PreparedDoc(
+            file_path=file_path,
+            slug=slug,
+            collection_name=collection_name,
+            file_hash=current_hash,
+            is_tabular=is_tabular,
+            chunks=chunks,
+            summary=summary,
+            chunk_ids=chunk_ids,
+            new_idx=new_idx,
+            stale_ids=stale_ids,
+            moved=moved,
+        )
+
+    def _persist_one(self, doc: _PreparedDoc, embeddings: Optional[np.ndarray]) -> DocumentInfo:
+        file_path = doc.file_path
+        chunks = doc.chunks
+
+        if not doc.is_tabular:
+            # 5. Apply the chunk diff to the shared vector store
+            store = get_vector_store()
+            store.delete(doc.stale_ids)
+            if doc.new_idx:
+                store.add(
+                    ids=[doc.chunk_ids[i] for i in doc.new_idx],
+                    embeddings=embeddings,
+                    metadatas=[{"source": file_path.name, "chunk_index": i} for i in doc.new_idx],
+                    documents=[chunks[i] for i in doc.new_idx],
+                )
+            store.set_chunk_index(doc.moved)
+            print(f"  → [{file_path.name}] Stored {len(doc.new_idx)} new chunk(s) in the vector store "
+                  f"({len(chunks)} total)")
+
         # 6. Store metadata
         self._meta_collection.upsert(
-            ids=[slug],
-            documents=[summary],
+            ids=[doc.slug],
+            documents=[doc.summary],
             metadatas=[{
                 "file_name": file_path.name,
-                "file_hash": current_hash,
-                "chunk_count": str(chunk_count),
-                "collection_name": collection_name,
-                "is_tabular": str(is_tabular),
+                "file_hash": doc.file_hash,
+                "chunk_count": str(len(chunks)),
+                "collection_name": doc.collection_name,
+                "is_tabular": str(doc.is_tabular),
             }],
         )
         print(f"  ✓ Done processing '{file_path.name}'\n")
 
-        return DocumentInfo(
-            name=file_path.name,
-            slug=slug,
-            summary=summary,
-            chunk_count=chunk_count,
-            collection_name=collection_name,
-            is_tabular=is_tabular,
-            file_path=str(file_path),
-        )
+        return doc.to_info()
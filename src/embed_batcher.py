@@ -0,0 +1,75 @@
+"""
+Embed Batcher — dynamic batching for query embeddings.
+
+Concurrent request threads each need a single query embedded. Instead of
+running one SentenceTransformer forward pass per request, callers submit
+their text to a shared queue and block on a Future; a single background
+thread drains the queue (up to max_batch items, or whatever arrives within
+max_latency_ms) and encodes the whole batch in one call.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Tuple
+
+import numpy as np
+
+from src.config import embed_model, EMBED_MAX_BATCH, EMBED_MAX_LATENCY_MS
+
+
+class QueueBatcher:
+    """Coalesces concurrent encode requests into batched model calls."""
+
+    def __init__(self, max_batch: int = EMBED_MAX_BATCH,
+                 max_latency_ms: float = EMBED_MAX_LATENCY_MS):
+        self.max_batch = max_batch
+        self.max_latency = max_latency_ms / 1000.0
+        self._queue: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._worker, name="embed-batcher", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, text: str) -> Future:
+        """Queue a text for embedding. The Future resolves to a normalized float32 vector."""
+        future: Future = Future()
+        self._queue.put((text, future))
+        return future
+
+    # ── Background worker ───────────────────────────────────────────
+
+    def _worker(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_latency
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._run_batch(batch)
+
+    def _run_batch(self, batch: List[Tuple[str, Future]]) -> None:
+        texts = [text for text, _ in batch]
+        try:
+            vecs = embed_model.encode(
+                texts,
+                batch_size=self.max_batch,
+                normalize_embeddings=True,
+                show_progress_bar=False,
+            ).astype(np.float32)
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), vec in zip(batch, vecs):
+            future.set_result(vec)
+
+
+# Shared process-wide batcher
+batcher = QueueBatcher()
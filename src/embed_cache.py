@@ -0,0 +1,92 @@
+"""
+Embed Cache — persistent chunk-embedding cache.
+
+Maps (embedding model name, BLAKE2b of the text) to the text's normalized
+embedding, stored as float16 in a SQLite file next to the ChromaDB data.
+Chunks that recur verbatim across document versions (or across documents)
+are never re-encoded.
+"""
+
+import hashlib
+import sqlite3
+import threading
+from typing import List
+
+import numpy as np
+
+from src.config import embed_model, EMBEDDING_MODEL_NAME, EMBED_BATCH_SIZE, CHROMA_DB_DIR
+
+EMBED_CACHE_PATH = CHROMA_DB_DIR / "embed_cache.sqlite"
+
+_lock = threading.Lock()
+_conn: sqlite3.Connection = None
+
+
+def _get_conn() -> sqlite3.Connection:
+    global _conn
+    if _conn is None:
+        CHROMA_DB_DIR.mkdir(parents=True, exist_ok=True)
+        _conn = sqlite3.connect(str(EMBED_CACHE_PATH), check_same_thread=False)
+        _conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL, text_hash TEXT NOT NULL, vec BLOB NOT NULL,"
+            " PRIMARY KEY (model, text_hash))"
+        )
+        _conn.commit()
+    return _conn
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def get_or_compute(texts: List[str], batch_size: int = EMBED_BATCH_SIZE,
+                   show_progress_bar: bool = False) -> np.ndarray:
+    """Return normalized float32 embeddings for texts, encoding only cache misses."""
+    if not texts:
+        return np.zeros((0, embed_model.get_sentence_embedding_dimension()), dtype=np.float32)
+
+    hashes = [_text_hash(t) for t in texts]
+    unique = list(dict.fromkeys(hashes))
+
+    found = {}
+    with _lock:
+        conn = _get_conn()
+        for start in range(0, len(unique), 500):  # stay under SQLite's variable limit
+            window = unique[start:start + 500]
+            rows = conn.execute(
+                f"SELECT text_hash, vec FROM embeddings WHERE model = ? "
+                f"AND text_hash IN ({','.join('?' * len(window))})",
+                [EMBEDDING_MODEL_NAME, *window],
+            ).fetchall()
+            for h, blob in rows:
+                found[h] = np.frombuffer(blob, dtype=np.float16)
+
+    miss_hashes = [h for h in unique if h not in found]
+    if miss_hashes:
+        first_text = {}
+        for h, t in zip(hashes, texts):
+            first_text.setdefault(h, t)
+        vecs = embed_model.encode(
+            [first_text[h] for h in miss_hashes],
+            batch_size=batch_size,
+            show_progress_bar=show_progress_bar,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        ).astype(np.float16)
+        with _lock:
+            conn = _get_conn()
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vec) VALUES (?, ?, ?)",
+                [(EMBEDDING_MODEL_NAME, h, v.tobytes()) for h, v in zip(miss_hashes, vecs)],
+            )
+            conn.commit()
+        found.update(zip(miss_hashes, vecs))
+
+    print(f"[EmbedCache] {len(unique) - len(miss_hashes)} hit(s), {len(miss_hashes)} miss(es)")
+    # Fill the float32 result directly from the float16 rows (one pass, no
+    # intermediate float16 stack); subarray dtypes need numpy >= 1.23
+    dim = embed_model.get_sentence_embedding_dimension()
+    return np.fromiter(
+        (found[h] for h in hashes), dtype=np.dtype((np.float32, dim)), count=len(hashes)
+    )
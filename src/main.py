@@ -9,10 +9,7 @@ Workflow:
 """
 
 import sys
-from src.document_processor import DocumentProcessor
-from src.tool_factory import ToolFactory
-from src.agent_worker import AgentWorker
-from src.agent_runner import AgentRunner
+import argparse
 
 
 BANNER = """
@@ -24,6 +21,19 @@ BANNER = """
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Agentic RAG interactive CLI")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="documents processed concurrently during indexing")
+    args = parser.parse_args()
+
+    # Imported here rather than at module level: spawned PDF-extraction
+    # workers re-import this module as __mp_main__ and must not load the
+    # model stack from src.config
+    from src.document_processor import DocumentProcessor
+    from src.tool_factory import ToolFactory
+    from src.agent_worker import AgentWorker
+    from src.agent_runner import AgentRunner
+
     print(BANNER)
 
     # ── Step 1: Document Processing ─────────────────────────────────
@@ -31,7 +41,9 @@ def main():
     print("  PHASE 1: DOCUMENT PROCESSING & INDEXING")
     print("=" * 60)
     processor = DocumentProcessor()
-    doc_infos = processor.process_all()
+    doc_infos = processor.process_all(
+        workers=args.workers, describe_tools=ToolFactory.tool_descriptions
+    )
 
     if not doc_infos:
         print("No documents found. Please add files to the Data/ folder.")
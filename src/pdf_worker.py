@@ -0,0 +1,47 @@
+"""
+PDF Worker — counts PDF pages and extracts text from a range of pages.
+
+MuPDF is not thread-safe, so these are the only places the project calls
+PyMuPDF; the document processor runs them in its process pool.
+
+Runs inside process-pool workers started with the "spawn" method, so it
+deliberately imports nothing from the project beyond PyMuPDF. Spawned
+children also re-run the parent's main script as __mp_main__; the entry
+points (server.py, src/main.py) keep their src.* imports out of that
+path, so workers don't load the embedding model or LLM client from
+src.config.
+"""
+
+from typing import Union
+
+import fitz  # PyMuPDF
+
+# Don't spend time writing MuPDF's recoverable parse warnings to stderr
+fitz.TOOLS.mupdf_display_errors(False)
+
+# Plain-text extraction flags: keep whitespace and clip to the page, but
+# expand ligatures (better for search) and skip image blocks.
+_TEXT_FLAGS = fitz.TEXT_PRESERVE_WHITESPACE | fitz.TEXT_MEDIABOX_CLIP
+
+
+def count_pages(source: Union[str, bytes]) -> int:
+    """Number of pages in a PDF path or in-memory PDF."""
+    doc = fitz.open(stream=source, filetype="pdf") if isinstance(source, bytes) else fitz.open(source)
+    try:
+        return doc.page_count
+    finally:
+        doc.close()
+
+
+def extract_pages(source: Union[str, bytes], start: int, end: int) -> str:
+    """Return the text of pages [start, end) of a PDF path or in-memory PDF, joined by newlines."""
+    doc = fitz.open(stream=source, filetype="pdf") if isinstance(source, bytes) else fitz.open(source)
+    try:
+        parts = []
+        for i in range(start, end):
+            page = doc.load_page(i)
+            parts.append(page.get_text("text", flags=_TEXT_FLAGS))
+            page = None  # release the page's MuPDF structures before the next one
+        return "\n".join(parts)
+    finally:
+        doc.close()
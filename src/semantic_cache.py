@@ -0,0 +1,101 @@
+"""
+Semantic Cache — nearest-neighbour lookup over normalized query embeddings.
+
+Maps query embeddings to arbitrary cached values. A lookup hits when the
+most similar embedding stored under the same key (e.g. the allowed_docs
+filter) has cosine similarity >= threshold; entries under other keys are
+ignored. Storing a near-duplicate of an entry with the same key replaces
+it. Entries live in a float32 buffer that grows by doubling up to
+`capacity`; after that the least recently used slot is overwritten.
+Thread-safe.
+"""
+
+import threading
+import time
+from typing import Any, Hashable, List, Optional
+
+import numpy as np
+
+
+class SemanticCache:
+    """Bounded LRU cache keyed on embedding similarity."""
+
+    def __init__(self, dim: int, threshold: float, capacity: int,
+                 ttl_seconds: Optional[float] = None):
+        self.threshold = threshold
+        self.capacity = capacity
+        self.ttl_seconds = ttl_seconds
+        # Rows [0, _len) of _vecs are live
+        self._vecs: np.ndarray = np.zeros((min(16, capacity), dim), dtype=np.float32)
+        self._keys: List[Hashable] = []
+        self._values: List[Any] = []
+        self._stored_at: List[float] = []
+        self._used: List[int] = []
+        self._len = 0
+        self._clock = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, vec: np.ndarray, key: Hashable = None) -> Optional[Any]:
+        """Return the value cached for a near-duplicate of vec under key, if any."""
+        with self._lock:
+            idx = self._nearest(vec, key)
+            if idx < 0:
+                return None
+            if self.ttl_seconds is not None and time.time() - self._stored_at[idx] > self.ttl_seconds:
+                return None
+            self._clock += 1
+            self._used[idx] = self._clock
+            return self._values[idx]
+
+    def store(self, vec: np.ndarray, value: Any, key: Hashable = None) -> None:
+        """
+        Insert vec → value under key. A near-duplicate already stored under
+        key is replaced in place; otherwise the LRU entry is evicted when full.
+        """
+        with self._lock:
+            self._clock += 1
+            idx = self._nearest(vec, key)
+            if idx >= 0:
+                self._values[idx] = value
+                self._stored_at[idx] = time.time()
+                self._used[idx] = self._clock
+            elif self._len < self.capacity:
+                if self._len == len(self._vecs):
+                    grown = np.zeros(
+                        (min(2 * len(self._vecs), self.capacity), self._vecs.shape[1]),
+                        dtype=np.float32,
+                    )
+                    grown[:self._len] = self._vecs[:self._len]
+                    self._vecs = grown
+                idx = self._len
+                self._len += 1
+                self._keys.append(key)
+                self._values.append(value)
+                self._stored_at.append(time.time())
+                self._used.append(self._clock)
+            else:
+                idx = int(np.argmin(self._used))
+                self._keys[idx] = key
+                self._values[idx] = value
+                self._stored_at[idx] = time.time()
+                self._used[idx] = self._clock
+            self._vecs[idx] = vec
+
+    def _nearest(self, vec: np.ndarray, key: Hashable) -> int:
+        """Slot of the most similar entry under key if it meets threshold, else -1."""
+        if self._len == 0:
+            return -1
+        sims = self._vecs[:self._len] @ vec
+        same_key = np.fromiter((k == key for k in self._keys), dtype=bool, count=self._len)
+        sims[~same_key] = -np.inf
+        idx = int(np.argmax(sims))
+        return idx if sims[idx] >= self.threshold else -1
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._keys.clear()
+            self._values.clear()
+            self._stored_at.clear()
+            self._used.clear()
+            self._len = 0
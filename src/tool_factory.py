@@ -10,22 +10,34 @@ Pandas Analysis Tool:
   - Executes code safely on the loaded dataframe
 """
 
+import re
+import ast
 import sys
 import io
+import functools
+import hashlib
+import threading
 import traceback
+from collections import OrderedDict
+from concurrent.futures import Future
 from dataclasses import dataclass
-from typing import Callable, List, Optional
+from pathlib import Path
+from types import CodeType
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
-import chromadb
 
 from src.config import (
-    embed_model,
+    FRAME_CACHE_DIR,
     llm_chat,
-    CHROMA_DB_DIR,
     TOP_K_CHUNKS,
+    PANDAS_CODE_CACHE_SIZE,
+    PANDAS_TRACEBACKS,
 )
-from src.document_processor import DocumentInfo
+from src.embed_batcher import batcher
+from src.document_processor import DocumentInfo, _read_excel
+from src.vector_store import get_vector_store
 
 
 # ── Data Classes ────────────────────────────────────────────────────
@@ -40,118 +52,473 @@ class Tool:
     function: Callable[[str], str]   # accepts query, returns text
 
 
+# ── Tool Descriptions ───────────────────────────────────────────────
+# Descriptions depend only on DocumentInfo, so they can be produced (and
+# embedded) before any tool is built.
+
+def _pandas_description(info: DocumentInfo) -> str:
+    # A clearer description to help the agent select this tool for data questions
+    return (
+        f"Analyze data in the file '{info.name}' using pandas. "
+        f"Useful for counting, filtering, aggregating, finding averages, "
+        f"sums, max/min values, or any structured data queries. "
+        f"The dataset contains: {info.snippet}..."
+    )
+
+
+def _vector_description(info: DocumentInfo) -> str:
+    return (
+        f"Search for specific facts, figures, names, dates, definitions, "
+        f"or detailed information within the document '{info.name}'. "
+        f"This document covers: {info.snippet}..."
+    )
+
+
+def _summary_description(info: DocumentInfo) -> str:
+    return (
+        f"Get a high-level overview, themes, main topics, or general "
+        f"understanding of the document '{info.name}'. "
+        f"This document covers: {info.snippet}..."
+    )
+
+
+# ── Pandas Code Cache ───────────────────────────────────────────────
+# Queries that differ only in literal values ("top 5 ..." / "top 10 ...")
+# share one generated program. Literals are replaced by NUM_i / STR_i
+# variables that the code must reference, so a cached program is re-run
+# with the new query's values bound instead of calling the LLM again.
+
+# Quotes must not touch a word character, so apostrophes ("what's",
+# "region's") are not mistaken for string delimiters
+_QUOTED_RE = re.compile(r"(?<!\w)'([^']*)'(?!\w)|(?<!\w)\"([^\"]*)\"(?!\w)")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+
+_code_cache: "OrderedDict[Tuple[str, str], Tuple[str, CodeType]]" = OrderedDict()
+_code_cache_lock = threading.Lock()
+
+
+def query_template(query: str) -> Tuple[str, Dict[str, Any]]:
+    """
+    Replace quoted strings and numbers with variable names; return
+    (template, bindings). The template is whitespace-normalized; callers
+    lowercase it for the cache key. Also used by AgentRunner to key its
+    response cache on the query's literal values.
+    """
+    literals: Dict[str, Any] = {}
+
+    def _str(m: re.Match) -> str:
+        name = f"STR_{sum(k.startswith('STR_') for k in literals)}"
+        literals[name] = m.group(1) if m.group(1) is not None else m.group(2)
+        return name
+
+    def _num(m: re.Match) -> str:
+        name = f"NUM_{sum(k.startswith('NUM_') for k in literals)}"
+        text = m.group(0)
+        literals[name] = float(text) if "." in text else int(text)
+        return name
+
+    template = _NUMBER_RE.sub(_num, _QUOTED_RE.sub(_str, query.strip()))
+    return " ".join(template.split()), literals
+
+
+def _is_reusable(code: str, literals: Dict[str, Any]) -> bool:
+    """
+    True if the code can safely be re-run with other literal values: its
+    AST references every NUM_i / STR_i variable it was given, and it does
+    not also spell out any of the values themselves.
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return False
+    names = {node.id for node in ast.walk(tree) if isinstance(node, ast.Name)}
+    if not names.issuperset(literals):
+        return False
+    for value in literals.values():
+        if isinstance(value, str):
+            if value and value in code:
+                return False
+        elif re.search(rf"(?<![\w.]){re.escape(str(value))}(?![\w.])", code):
+            return False
+    return True
+
+
+# Modules generated code may import (pd and np are also pre-bound)
+_ALLOWED_IMPORTS = frozenset({"pandas", "numpy", "math", "statistics", "datetime", "re"})
+
+
+@functools.lru_cache(maxsize=256)
+def _compile(code: str) -> CodeType:
+    """
+    Parse generated code once per distinct source string, reject imports
+    outside _ALLOWED_IMPORTS, and compile the already-parsed tree.
+    Raises SyntaxError or ValueError for code that must not run.
+    """
+    tree = ast.parse(code, "<pandas_tool>", "exec")
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            modules = [node.module or ""]
+        else:
+            continue
+        for module in modules:
+            if module.split(".")[0] not in _ALLOWED_IMPORTS:
+                raise ValueError(f"import of '{module}' is not allowed in generated code")
+    return compile(tree, "<pandas_tool>", "exec")
+
+
+# Code generations in progress, so concurrent requests with the same
+# (template, schema) share one LLM call instead of each issuing their own
+_inflight: Dict[Tuple[str, str], Future] = {}
+_inflight_lock = threading.Lock()
+
+
+def _generate_shared(key: Tuple[str, str], literals: Dict[str, Any],
+                     generate: Callable[[], str]) -> str:
+    """
+    Return generate()'s code for key. If another thread is already
+    generating code for the same key, wait for it and reuse its code,
+    unless that code isn't reusable with other literal values.
+    """
+    with _inflight_lock:
+        future = _inflight.get(key)
+        owner = future is None
+        if owner:
+            future = Future()
+            _inflight[key] = future
+
+    if not owner:
+        try:
+            code, owner_literals = future.result()
+            if _is_reusable(code, owner_literals):
+                return code
+        except Exception:
+            pass  # the owner failed; try on our own
+        return generate()
+
+    try:
+        code = generate()
+        future.set_result((code, literals))
+        return code
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+
+def _code_cache_get(key: Tuple[str, str]) -> Optional[Tuple[str, CodeType]]:
+    with _code_cache_lock:
+        entry = _code_cache.get(key)
+        if entry is not None:
+            _code_cache.move_to_end(key)
+        return entry
+
+
+def _code_cache_put(key: Tuple[str, str], code: str, compiled: CodeType) -> None:
+    with _code_cache_lock:
+        _code_cache[key] = (code, compiled)
+        _code_cache.move_to_end(key)
+        while len(_code_cache) > PANDAS_CODE_CACHE_SIZE:
+            _code_cache.popitem(last=False)
+
+
+# ── Query Embeddings ────────────────────────────────────────────────
+
+@functools.lru_cache(maxsize=2048)
+def _encode_query(query: str) -> np.ndarray:
+    """
+    Normalized float32 query embedding, memoized per query string. The
+    agent passes the same query to every tool it calls, so repeated
+    vector-tool calls skip the encoder entirely.
+    """
+    vec = batcher.submit(query).result()
+    vec.setflags(write=False)  # shared between callers
+    return vec
+
+
+# ── Dataframe Loading ───────────────────────────────────────────────
+
+def _read_csv(path: Path) -> pd.DataFrame:
+    """
+    Parse a CSV with the multithreaded pyarrow engine into Arrow-backed
+    dtypes; fall back to the C engine if pyarrow is missing or rejects
+    the file.
+    """
+    try:
+        return pd.read_csv(path, engine="pyarrow", dtype_backend="pyarrow")
+    except (ImportError, ValueError):
+        return pd.read_csv(path)
+
+
+def _load_dataframe(info: DocumentInfo) -> pd.DataFrame:
+    """
+    Load a tabular document. The first load writes a Feather copy to
+    FRAME_CACHE_DIR; later loads read that instead of re-parsing the
+    CSV/Excel file, as long as it is newer than the source.
+
+    The cache file is named after the full source filename, not just the
+    slug, so sales.csv and sales.xlsx (or sales-1.csv and sales_1.csv)
+    never share a cached frame.
+    """
+    src = Path(info.file_path)
+    name_key = hashlib.blake2b(src.name.encode("utf-8"), digest_size=8).hexdigest()
+    cache_path = FRAME_CACHE_DIR / f"{info.slug}{src.suffix.lower()}.{name_key}.feather"
+    try:
+        if cache_path.stat().st_mtime >= src.stat().st_mtime:
+            return pd.read_feather(cache_path, dtype_backend="pyarrow")
+    except Exception:
+        pass  # no cache yet, stale/corrupt cache, or pyarrow missing
+
+    df = _read_csv(src) if src.suffix.lower() == ".csv" else _read_excel(src, dtype_backend="pyarrow")
+    try:
+        FRAME_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(".feather.tmp")
+        df.to_feather(tmp_path)
+        tmp_path.replace(cache_path)
+    except Exception as e:
+        print(f"[ToolFactory] ⚠ Could not cache '{info.name}' as Feather: {e}")
+    return df
+
+
+# ── Pandas Fast Path ────────────────────────────────────────────────
+# Whole-query patterns for single-column aggregations and row counts,
+# answered with pandas' vectorized reductions without generating code.
+# Anything with extra qualifiers ("... by region", "... in 2023") does
+# not match and goes to the LLM.
+
+_FAST_AGG_RE = re.compile(
+    r"^(?:what(?:'s| is| are)\s+)?(?:the\s+)?"
+    r"(average|mean|sum|total|max|maximum|highest|min|minimum|lowest)\s+"
+    r"(?:of\s+)?(?:the\s+)?(?:column\s+)?(.+?)\s*\??$",
+    re.I,
+)
+_FAST_ROWS_RE = re.compile(r"^how many rows(?:\s+are\s+there)?(?:\s+in\s+the\s+data(?:set)?)?\s*\??$", re.I)
+_FAST_COUNT_RE = re.compile(
+    r"^(?:how many rows|count rows|count)\s+(?:where|with)\s+(.+?)(?:\s*==?\s*|\s+(?:is|equals)\s+)(.+?)\s*\??$",
+    re.I,
+)
+# Count values that are really compound conditions ("not West", "West or
+# East", "> 5") go to the LLM instead of being compared as a literal
+_FAST_COMPOUND_RE = re.compile(r"\b(?:not|or|and|like|between)\b|[<>!]", re.I)
+_FAST_AGG_FN = {
+    "average": "mean", "mean": "mean", "sum": "sum", "total": "sum",
+    "max": "max", "maximum": "max", "highest": "max",
+    "min": "min", "minimum": "min", "lowest": "min",
+}
+
+
+def _match_column(df: pd.DataFrame, text: str) -> Optional[str]:
+    """The df column named by text, ignoring case, quotes, and '_' vs ' '."""
+    def norm(name: Any) -> str:
+        return " ".join(str(name).strip().strip("'\"`").replace("_", " ").lower().split())
+    wanted = norm(text)
+    return next((col for col in df.columns if norm(col) == wanted), None)
+
+
+def _fast_dispatch(query: str, df: pd.DataFrame) -> Optional[str]:
+    """Answer simple aggregation/count queries directly; None if the query needs the LLM."""
+    query = query.strip()
+    if _FAST_ROWS_RE.match(query):
+        return str(len(df))
+
+    m = _FAST_AGG_RE.match(query)
+    if m:
+        col = _match_column(df, m.group(2))
+        if col is None or not pd.api.types.is_numeric_dtype(df[col]):
+            return None
+        return str(getattr(df[col], _FAST_AGG_FN[m.group(1).lower()])())
+
+    m = _FAST_COUNT_RE.match(query)
+    if m:
+        col = _match_column(df, m.group(1))
+        if col is None:
+            return None
+        value = m.group(2).strip().strip("'\"`")
+        if not value or _FAST_COMPOUND_RE.search(value):
+            return None
+        series = df[col]
+        if pd.api.types.is_numeric_dtype(series):
+            try:
+                count = int((series == float(value)).sum())
+            except ValueError:
+                return None
+        else:
+            count = int((series.astype(str).str.casefold() == value.casefold()).sum())
+        # A value that never occurs is more likely a misparse (or needs a
+        # looser match) than a true zero; let the LLM handle it
+        return str(count) if count else None
+    return None
+
+
+def _return_const(text: str, _query: str) -> str:
+    """Tool function body for summary tools: the answer doesn't depend on the query."""
+    return text
+
+
 # ── Tool Factory ────────────────────────────────────────────────────
 
 class ToolFactory:
     """Build tools for a set of documents."""
 
-    def __init__(self):
-        CHROMA_DB_DIR.mkdir(parents=True, exist_ok=True)
-        self.chroma_client = chromadb.PersistentClient(path=str(CHROMA_DB_DIR))
-
-    def build_tools(self, doc_infos: List[DocumentInfo]) -> List[Tool]:
-        """Create appropriate tools per document and persist descriptions."""
-        tools: List[Tool] = []
-
+    @staticmethod
+    def tool_descriptions(doc_infos: List[DocumentInfo]) -> List[str]:
+        """Descriptions of every tool build_tools will create, in build order."""
+        descriptions: List[str] = []
         for info in doc_infos:
             if info.is_tabular:
-                # ── Pandas Tool ─────────────────────────────────────
-                pandas_tool = self._make_pandas_tool(info)
-                tools.append(pandas_tool)
+                descriptions.append(_pandas_description(info))
             else:
-                # ── Vector Tool ─────────────────────────────────────
-                vector_tool = self._make_vector_tool(info)
-                tools.append(vector_tool)
+                descriptions.append(_vector_description(info))
+                descriptions.append(_summary_description(info))
+        return descriptions
 
-                # ── Summary Tool ────────────────────────────────────
-                summary_tool = self._make_summary_tool(info)
-                tools.append(summary_tool)
+    def build_tools(self, doc_infos: List[DocumentInfo]) -> List[Tool]:
+        """Create appropriate tools per document."""
+        # Per-document construction does no I/O (dataframes load lazily on
+        # first query), so it runs inline rather than on a thread pool
+        tools: List[Tool] = [t for info in doc_infos for t in self._build_for_doc(info)]
 
-        # ── Persist tool descriptions in ChromaDB ───────────────────
-        self._persist_tool_descriptions(tools)
+        # Front-load first-query costs (query encode path, per-document
+        # float32 matrices) off the startup thread
+        sources = [info.name for info in doc_infos if not info.is_tabular]
+        threading.Thread(target=self._warmup, args=(sources,), name="tool-warmup", daemon=True).start()
 
         print(f"[ToolFactory] Built {len(tools)} tools for {len(doc_infos)} document(s)\n")
         return tools
 
+    def _warmup(self, sources: List[str]) -> None:
+        try:
+            batcher.submit("warmup").result()
+            get_vector_store().warm(sources)
+        except Exception as e:
+            print(f"[ToolFactory] ⚠ Warmup failed: {e}")
+
+    def _build_for_doc(self, info: DocumentInfo) -> List[Tool]:
+        """The tools for one document, in tool_descriptions() order."""
+        if info.is_tabular:
+            # ── Pandas Tool ─────────────────────────────────────────
+            return [self._make_pandas_tool(info)]
+        # ── Vector + Summary Tools ──────────────────────────────────
+        return [self._make_vector_tool(info), self._make_summary_tool(info)]
+
     # ── Pandas Tool Builder ─────────────────────────────────────────
 
     def _make_pandas_tool(self, info: DocumentInfo) -> Tool:
         name = f"pandas_analysis_{info.slug}"
-        summary_snippet = info.summary[:200].replace("\n", " ")
-        # A clearer description to help the agent select this tool for data questions
-        description = (
-            f"Analyze data in the file '{info.name}' using pandas. "
-            f"Useful for counting, filtering, aggregating, finding averages, "
-            f"sums, max/min values, or any structured data queries. "
-            f"The dataset contains: {summary_snippet}..."
-        )
+        description = _pandas_description(info)
         
-        # Pre-load dataframe to avoid reading from disk on every query
-        # (For very large files, you might want to load on demand instead)
-        try:
-            if info.name.endswith(".csv"):
-                df = pd.read_csv(info.file_path)
-            else:
-                df = pd.read_excel(info.file_path)
-        except Exception as e:
-            print(f"[ToolFactory] Error loading dataframe for {info.name}: {e}")
-            df = pd.DataFrame() # Fallback empty DF
+        # Load the dataframe on the tool's first query and keep it, so
+        # tabular files that are never queried cost no startup time or RAM
+        load_lock = threading.Lock()
 
-        def pandas_fn(query: str, _df=df, _fname=info.name) -> str:
+        @functools.lru_cache(maxsize=1)
+        def _load() -> Tuple[pd.DataFrame, str]:
+            """The dataframe and its prompt schema string, built once."""
+            try:
+                df = _load_dataframe(info)
+            except Exception as e:
+                print(f"[ToolFactory] Error loading dataframe for {info.name}: {e}")
+                df = pd.DataFrame() # Fallback empty DF
+            schema_str = ", ".join(f"{col} ({dtype})" for col, dtype in df.dtypes.items())
+            return df, schema_str
+
+        def pandas_fn(query: str, _fname=info.name) -> str:
             """Generate and execute pandas code to answer the query."""
+            with load_lock:  # one load even if the first queries arrive together
+                _df, schema_str = _load()
+
+            fast = _fast_dispatch(query, _df)
+            if fast is not None:
+                print(f"\n[PandasTool] Answered without code generation: {query}\n")
+                return fast
             
             # 1. Generate Code
-            schema_info = []
-            for col, dtype in _df.dtypes.items():
-                schema_info.append(f"{col} ({dtype})")
-            schema_str = ", ".join(schema_info)
-            
-            prompt = (
-                f"You are a pandas data analysis assistant. \n"
-                f"I have a dataframe named `df` from file '{_fname}'.\n"
-                f"Columns: {schema_str}\n\n"
-                f"USER QUERY: {query}\n\n"
-                f"Write Python code to answer this query. \n"
-                f"RULES:\n"
-                f"1. Assume `df` is already loaded.\n"
-                f"2. Store the final result in a variable named `result`.\n"
-                f"3. Do NOT use print() — just assign `result`.\n"
-                f"4. Return ONLY valid Python code, no markdown, no comments.\n"
-                f"5. If the query asks for a plot, just return a string saying 'Plotting not supported yet'.\n"
-            )
-            
-            code = llm_chat(prompt, system_prompt="You are a python coding machine. Output ONLY code.").strip()
-            
-            # Sanitization (basic)
-            code = code.replace("```python", "").replace("```", "").strip()
-            
-            print(f"\n[PandasTool] Generated code:\n{code}\n")
-            
-            # 2. Execute Code
-            local_vars = {"df": _df, "result": None}
+            template, literals = query_template(query)
+            cache_key = (template.lower(), schema_str)
+            cached = _code_cache_get(cache_key)
+
+            if cached is not None:
+                code, compiled = cached
+                print(f"\n[PandasTool] Reusing cached code for template: {template}\n")
+            else:
+                def _generate() -> str:
+                    bindings = "".join(f"   {k} = {v!r}\n" for k, v in literals.items())
+                    prompt = (
+                        f"You are a pandas data analysis assistant. \n"
+                        f"I have a dataframe named `df` from file '{_fname}'.\n"
+                        f"Columns: {schema_str}\n\n"
+                        f"USER QUERY: {template}\n\n"
+                        f"Write Python code to answer this query. \n"
+                        f"RULES:\n"
+                        f"1. Assume `df` is already loaded and `pd` / `np` are imported.\n"
+                        f"2. Store the final result in a variable named `result`.\n"
+                        f"3. Do NOT use print() — just assign `result`.\n"
+                        f"4. Return ONLY valid Python code, no markdown, no comments.\n"
+                        f"5. If the query asks for a plot, just return a string saying 'Plotting not supported yet'.\n"
+                    )
+                    if literals:
+                        prompt += (
+                            f"6. These variables are already defined with the query's values. "
+                            f"Use the variable names, never the values themselves:\n{bindings}"
+                        )
+
+                    code = llm_chat(prompt, system_prompt="You are a python coding machine. Output ONLY code.").strip()
+
+                    # Sanitization (basic)
+                    return code.replace("```python", "").replace("```", "").strip()
+
+                code = _generate_shared(cache_key, literals, _generate)
+                compiled = None
+
+                print(f"\n[PandasTool] Generated code:\n{code}\n")
             
-            # Redirect stdout to capture any print usage if the LLM violates the rule
-            old_stdout = sys.stdout
-            captured_output = io.StringIO()
-            sys.stdout = captured_output
+            # 2. Validate + compile (malformed code or disallowed imports never run)
+            if compiled is None:
+                try:
+                    compiled = _compile(code)
+                except (SyntaxError, ValueError) as e:
+                    return f"Error in generated pandas code (not executed): {e!r}"
+
+            # 3. Execute Code
+            # A fresh namespace per call, used as globals only: nothing a
+            # program assigns can leak into later calls or other threads,
+            # and lambdas/comprehensions can see df and the literals
+            namespace = {"__builtins__": __builtins__, "pd": pd, "np": np,
+                         "df": _df, "result": None, **literals}
             
+            # Redirect stdout to capture print usage if the LLM violates the
+            # rule; code without print( runs without touching sys.stdout
+            capture = "print(" in code
+            if capture:
+                old_stdout = sys.stdout
+                captured_output = io.StringIO()
+                sys.stdout = captured_output
+
             try:
-                exec(code, {}, local_vars)
-                result = local_vars.get("result")
-                sys.stdout = old_stdout # Restore stdout
-                
-                output_str = captured_output.getvalue().strip()
-                
-                if result is not None:
-                    return str(result)
-                elif output_str:
-                    return output_str
-                else:
-                    return "Code executed successfully but `result` variable was None."
-                    
+                exec(compiled, namespace)
             except Exception as e:
-                sys.stdout = old_stdout # Restore stdout
-                return f"Error executing pandas code:\n{traceback.format_exc()}"
+                detail = traceback.format_exc() if PANDAS_TRACEBACKS else repr(e)
+                return f"Error executing pandas code:\n{detail}"
+            finally:
+                if capture:
+                    sys.stdout = old_stdout # Restore stdout
+
+            # Only programs that ran and use the literal variables are reusable
+            if cached is None and _is_reusable(code, literals):
+                _code_cache_put(cache_key, code, compiled)
+
+            result = namespace.get("result")
+            output_str = captured_output.getvalue().strip() if capture else ""
+
+            if result is not None:
+                return str(result)
+            elif output_str:
+                return output_str
+            else:
+                return "Code executed successfully but `result` variable was None."
 
         return Tool(
             name=name,
@@ -164,31 +531,21 @@ class ToolFactory:
     # ── Vector Tool Builder ─────────────────────────────────────────
 
     def _make_vector_tool(self, info: DocumentInfo) -> Tool:
-        collection_name = info.collection_name
-        summary_snippet = info.summary[:200].replace("\n", " ")
-
         name = f"vector_search_{info.slug}"
-        description = (
-            f"Search for specific facts, figures, names, dates, definitions, "
-            f"or detailed information within the document '{info.name}'. "
-            f"This document covers: {summary_snippet}..."
-        )
+        description = _vector_description(info)
+
+        store = get_vector_store()  # resolved once per tool, not per query
 
-        def vector_fn(query: str, _cname=collection_name) -> str:
-            """Query ChromaDB collection for top-K similar chunks."""
-            collection = self.chroma_client.get_collection(name=_cname)
-            query_embedding = embed_model.encode([query]).tolist()
-            results = collection.query(
-                query_embeddings=query_embedding,
-                n_results=TOP_K_CHUNKS,
-            )
-            if results["documents"] and results["documents"][0]:
-                chunks = results["documents"][0]
-                return "\n\n---\n\n".join(
-                    f"[Chunk {i+1}] {chunk}"
-                    for i, chunk in enumerate(chunks)
-                )
-            return "(No relevant chunks found)"
+        def vector_fn(query: str, _source=info.name, _store=store) -> str:
+            """Query the vector store for the document's top-K similar chunks."""
+            chunks = _store.query(_encode_query(query), TOP_K_CHUNKS, _source)
+            if not chunks:
+                return "(No relevant chunks found)"
+            # One join over the pieces; no per-chunk intermediate strings
+            parts: List[str] = []
+            for i, chunk in enumerate(chunks, 1):
+                parts += ("[Chunk ", str(i), "] ", chunk, "\n\n---\n\n")
+            return "".join(parts[:-1])
 
         return Tool(
             name=name,
@@ -201,49 +558,17 @@ class ToolFactory:
     # ── Summary Tool Builder ────────────────────────────────────────
 
     def _make_summary_tool(self, info: DocumentInfo) -> Tool:
-        summary_text = info.summary
-        summary_snippet = info.summary[:200].replace("\n", " ")
+        summary_text = sys.intern(info.summary)
 
         name = f"summary_{info.slug}"
-        description = (
-            f"Get a high-level overview, themes, main topics, or general "
-            f"understanding of the document '{info.name}'. "
-            f"This document covers: {summary_snippet}..."
-        )
-
-        def summary_fn(query: str, _summary=summary_text) -> str:
-            return _summary
+        description = _summary_description(info)
 
+        # Module-level partial instead of a closure: no per-call closure
+        # setup, and picklable for out-of-process workers
         return Tool(
             name=name,
             description=description,
             tool_type="summary",
             document_name=info.name,
-            function=summary_fn,
-        )
-
-    # ── Tool Description Persistence ────────────────────────────────
-
-    def _persist_tool_descriptions(self, tools: List[Tool]) -> None:
-        """Embed and store all tool descriptions in ChromaDB for semantic lookup."""
-        # Use get_or_create + upsert to avoid HNSW index flush race conditions
-        # that cause intermittent "Nothing found on disk" errors
-        td_collection = self.chroma_client.get_or_create_collection(
-            name="tool-descriptions"
-        )
-
-        names = [t.name for t in tools]
-        descriptions = [t.description for t in tools]
-        embeddings = embed_model.encode(descriptions, show_progress_bar=False).tolist()
-        metadatas = [
-            {"tool_type": t.tool_type, "document_name": t.document_name}
-            for t in tools
-        ]
-
-        td_collection.upsert(
-            ids=names,
-            documents=descriptions,
-            embeddings=embeddings,
-            metadatas=metadatas,
+            function=functools.partial(_return_const, summary_text),
         )
-        print(f"[ToolFactory] Persisted {len(tools)} tool descriptions to ChromaDB")
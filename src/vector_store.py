@@ -0,0 +1,193 @@
+"""
+Vector Store — single on-disk chunk index shared by every text document.
+
+Replaces the per-document ChromaDB collections for chunk embeddings:
+  - Vectors live in one float16 NumPy memmap (vectors.f16), one row per
+    chunk, grown by doubling. Appends are plain writes into the mapping.
+  - Chunk ids, source document, chunk_index and text live in a small
+    SQLite table keyed by row number, indexed by source.
+  - Queries filter by source (the document name) instead of opening a
+    collection per document. Each document's rows are converted once to
+    a float32 matrix and scored exactly with one matrix-vector product.
+
+Deleted chunks leave unused rows in the memmap; they are never read.
+ChromaDB is still used for the small document-meta collection.
+"""
+
+import functools
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from src.config import embed_model, VECTOR_STORE_DIR
+
+_MIN_CAPACITY = 1024
+_SQL_WINDOW = 500  # stay under SQLite's variable limit
+
+
+class VectorStore:
+    """Append-only float16 memmap of chunk vectors plus a SQLite chunk table."""
+
+    def __init__(self, directory: Path, dim: int):
+        directory.mkdir(parents=True, exist_ok=True)
+        self.dim = dim
+        self._vec_path = directory / "vectors.f16"
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(str(directory / "chunks.sqlite"), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            " row INTEGER PRIMARY KEY, id TEXT UNIQUE NOT NULL, source TEXT NOT NULL,"
+            " chunk_index INTEGER NOT NULL, document TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS chunks_source ON chunks (source)")
+        self._conn.commit()
+
+        self._next_row: int = self._conn.execute(
+            "SELECT COALESCE(MAX(row) + 1, 0) FROM chunks"
+        ).fetchone()[0]
+        file_rows = self._vec_path.stat().st_size // (dim * 2) if self._vec_path.exists() else 0
+        self._vecs = self._open(max(_MIN_CAPACITY, self._next_row, file_rows))
+        # source -> (float32 matrix, row numbers), built on first query
+        self._mats: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+    # ── Writes ──────────────────────────────────────────────────────
+
+    def add(self, ids: List[str], embeddings: np.ndarray, metadatas: List[dict],
+            documents: List[str]) -> None:
+        """
+        Insert or overwrite chunks. metadatas carry "source" (document
+        name) and "chunk_index", as in the old per-document collections.
+        """
+        if not ids:
+            return
+        embeddings = np.asarray(embeddings).reshape(len(ids), self.dim)
+        with self._lock:
+            existing = dict(self._select("SELECT id, row FROM chunks WHERE id IN ({})", ids))
+            rows = []
+            for cid in ids:
+                row = existing.get(cid)
+                if row is None:
+                    row = self._next_row
+                    self._next_row += 1
+                rows.append(row)
+            if self._next_row > len(self._vecs):
+                self._grow(self._next_row)
+            self._vecs[rows] = embeddings.astype(np.float16)
+            self._vecs.flush()  # vectors hit disk before their rows are committed
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO chunks (row, id, source, chunk_index, document)"
+                " VALUES (?, ?, ?, ?, ?)",
+                [
+                    (row, cid, meta["source"], int(meta["chunk_index"]), doc)
+                    for row, cid, meta, doc in zip(rows, ids, metadatas, documents)
+                ],
+            )
+            self._conn.commit()
+            for source in {meta["source"] for meta in metadatas}:
+                self._mats.pop(source, None)
+
+    def set_chunk_index(self, moved: Dict[str, int]) -> None:
+        """Update chunk_index for chunks whose position in the document changed."""
+        if not moved:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE chunks SET chunk_index = ? WHERE id = ?",
+                [(i, cid) for cid, i in moved.items()],
+            )
+            self._conn.commit()
+
+    def delete(self, ids: List[str]) -> None:
+        """Remove chunks by id. Their memmap rows are simply left unused."""
+        if not ids:
+            return
+        with self._lock:
+            for start in range(0, len(ids), _SQL_WINDOW):
+                window = ids[start:start + _SQL_WINDOW]
+                self._conn.execute(
+                    f"DELETE FROM chunks WHERE id IN ({','.join('?' * len(window))})", window
+                )
+            self._conn.commit()
+            self._mats.clear()
+
+    # ── Reads ───────────────────────────────────────────────────────
+
+    def chunk_index(self, source: str) -> Dict[str, int]:
+        """Map of chunk id → chunk_index for every stored chunk of a document."""
+        with self._lock:
+            return dict(self._conn.execute(
+                "SELECT id, chunk_index FROM chunks WHERE source = ?", (source,)
+            ).fetchall())
+
+    def count(self, source: str) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM chunks WHERE source = ?", (source,)
+            ).fetchone()[0]
+
+    def query(self, embedding: np.ndarray, k: int, source: str) -> List[str]:
+        """Texts of the k chunks of a document most similar to embedding, best first."""
+        with self._lock:
+            mat, rows = self._matrix(source)
+        if not len(rows):
+            return []
+        sims = mat @ np.asarray(embedding, dtype=np.float32).ravel()
+        k = min(k, len(rows))
+        idx = np.argpartition(-sims, k - 1)[:k]
+        best = rows[idx[np.argsort(-sims[idx])]].tolist()
+        with self._lock:
+            texts = dict(self._select("SELECT row, document FROM chunks WHERE row IN ({})", best))
+        return [texts[row] for row in best if row in texts]
+
+    def warm(self, sources: List[str]) -> None:
+        """Build the float32 matrices for these documents ahead of their first query."""
+        for source in sources:
+            with self._lock:
+                self._matrix(source)
+
+    # ── Internals ───────────────────────────────────────────────────
+
+    def _select(self, sql: str, params: Sequence) -> List[tuple]:
+        out: List[tuple] = []
+        for start in range(0, len(params), _SQL_WINDOW):
+            window = list(params[start:start + _SQL_WINDOW])
+            out.extend(self._conn.execute(sql.format(",".join("?" * len(window))), window).fetchall())
+        return out
+
+    def _matrix(self, source: str) -> Tuple[np.ndarray, np.ndarray]:
+        cached = self._mats.get(source)
+        if cached is None:
+            rows = np.fromiter(
+                (r for (r,) in self._conn.execute(
+                    "SELECT row FROM chunks WHERE source = ? ORDER BY row", (source,)
+                )),
+                dtype=np.int64,
+            )
+            cached = (np.ascontiguousarray(self._vecs[rows], dtype=np.float32), rows)
+            self._mats[source] = cached
+        return cached
+
+    def _open(self, capacity: int) -> np.memmap:
+        size = capacity * self.dim * np.dtype(np.float16).itemsize
+        with open(self._vec_path, "a+b") as f:
+            f.seek(0, 2)
+            if f.tell() < size:
+                f.truncate(size)
+        return np.memmap(self._vec_path, dtype=np.float16, mode="r+", shape=(capacity, self.dim))
+
+    def _grow(self, needed: int) -> None:
+        capacity = len(self._vecs)
+        while capacity < needed:
+            capacity *= 2
+        self._vecs.flush()
+        self._vecs = self._open(capacity)
+
+
+@functools.lru_cache(maxsize=1)
+def get_vector_store() -> VectorStore:
+    """Process-wide chunk vector store."""
+    return VectorStore(VECTOR_STORE_DIR, embed_model.get_sentence_embedding_dimension())